@@ -0,0 +1,160 @@
+# MIT License
+# Copyright (c) 2025 EveGlow
+"""
+ProjectRAX 命令行控制工具
+
+只依赖标准库，可在 SRA 运行时从任意终端调用，例如：
+
+    python plugins/StarRailAssistant-Plugin-Project-RA-X/cli.py status
+    python plugins/StarRailAssistant-Plugin-Project-RA-X/cli.py enable
+    python plugins/StarRailAssistant-Plugin-Project-RA-X/cli.py delay 120
+    python plugins/StarRailAssistant-Plugin-Project-RA-X/cli.py schedule stamina
+    python plugins/StarRailAssistant-Plugin-Project-RA-X/cli.py protector stats
+    python plugins/StarRailAssistant-Plugin-Project-RA-X/cli.py headless on
+
+修改会写入 config.json，由无界面守护线程在下一个轮询周期内生效；
+headless 开关需要重启 SRA 后生效。
+"""
+import argparse
+import json
+import os
+import socket
+import sys
+import time
+
+PLUGIN_DIR = os.path.dirname(os.path.abspath(__file__))
+DATA_DIR = os.environ.get("PROJECTRAX_DATA_DIR", PLUGIN_DIR)  # 与 core.py 保持一致
+CONFIG_PATH = os.path.join(DATA_DIR, "config.json")
+STATUS_PATH = os.path.join(DATA_DIR, "headless_status.json")
+PROTECTOR_LOCK_PATH = os.path.join(PLUGIN_DIR, "process_protector", "protector.lock")
+
+
+def load_config():
+    with open(CONFIG_PATH, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def save_config(config):
+    with open(CONFIG_PATH, "w", encoding="utf-8") as f:
+        json.dump(config, f, indent=4, ensure_ascii=False)
+
+
+def set_config(key, value):
+    config = load_config()
+    config[key] = value
+    save_config(config)
+    print(f"{key} = {json.dumps(value)}")
+
+
+def cmd_status(args):
+    config = load_config()
+    print("配置:")
+    for key, value in config.items():
+        print(f"  {key}: {json.dumps(value, ensure_ascii=False)}")
+    if not os.path.exists(STATUS_PATH):
+        print("守护状态: 未找到状态文件（无界面模式未运行）")
+        return 0
+    with open(STATUS_PATH, "r", encoding="utf-8") as f:
+        status = json.load(f)
+    age = time.time() - status.get("updated_at", 0)
+    poll = config.get("headless_poll", 30)
+    print(f"守护状态（{age:.0f} 秒前更新{'，可能已停止' if age > poll * 3 else ''}）:")
+    for key, value in status.items():
+        print(f"  {key}: {json.dumps(value, ensure_ascii=False)}")
+    return 0
+
+
+def cmd_enable(args):
+    set_config("check_task", True)
+    return 0
+
+
+def cmd_disable(args):
+    set_config("check_task", False)
+    return 0
+
+
+def cmd_delay(args):
+    if not 60 <= args.minutes <= 1440:
+        print("检测间隔必须在 60 到 1440 分钟之间", file=sys.stderr)
+        return 1
+    set_config("check_delay", args.minutes)
+    return 0
+
+
+def cmd_schedule(args):
+    set_config("schedule_mode", args.mode)
+    return 0
+
+
+def query_protector(port, command, timeout=2):
+    """向进程保护器的控制端口发送一条命令并返回解析后的应答"""
+    with socket.create_connection(("127.0.0.1", port), timeout=timeout) as conn:
+        conn.sendall(command.encode("utf-8") + b"\n")
+        with conn.makefile("r", encoding="utf-8") as reader:
+            return json.loads(reader.readline())
+
+
+def cmd_protector(args):
+    try:
+        with open(PROTECTOR_LOCK_PATH, "r", encoding="utf-8") as f:
+            lock = json.load(f)
+    except (OSError, ValueError):
+        print("进程保护器未运行")
+        return 1
+    try:
+        # 锁文件可能是残留的，端口也可能已被其它程序占用：
+        # 先确认应答中的 PID 与锁文件一致，再发送 stop/restart 等命令
+        reply = query_protector(lock["port"], "status")
+        if not isinstance(reply, dict) or reply.get("pid") != lock.get("pid"):
+            print("进程保护器未运行（锁文件已失效）", file=sys.stderr)
+            return 1
+        if args.action != "status":
+            reply = query_protector(lock["port"], args.action)
+    except (OSError, ValueError, KeyError) as e:
+        print(f"无法连接进程保护器（锁文件可能已失效）: {e}", file=sys.stderr)
+        return 1
+    print(json.dumps(reply, indent=4, ensure_ascii=False))
+    return 0
+
+
+def cmd_headless(args):
+    set_config("headless", args.state == "on")
+    print("重启 SRA 后生效")
+    return 0
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog="cli.py", description="ProjectRAX 命令行控制工具")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    sub.add_parser("status", help="显示配置与无界面守护状态").set_defaults(func=cmd_status)
+    sub.add_parser("enable", help="启用任务检测").set_defaults(func=cmd_enable)
+    sub.add_parser("disable", help="停用任务检测").set_defaults(func=cmd_disable)
+
+    p = sub.add_parser("delay", help="设置任务检测间隔（分钟）")
+    p.add_argument("minutes", type=int)
+    p.set_defaults(func=cmd_delay)
+
+    p = sub.add_parser("schedule", help="设置调度模式：固定间隔或按开拓力回复")
+    p.add_argument("mode", choices=["fixed", "stamina"])
+    p.set_defaults(func=cmd_schedule)
+
+    p = sub.add_parser("protector", help="查询或控制进程保护器")
+    p.add_argument("action", choices=["status", "stats", "restart", "stop"])
+    p.set_defaults(func=cmd_protector)
+
+    p = sub.add_parser("headless", help="开关无界面守护模式")
+    p.add_argument("state", choices=["on", "off"])
+    p.set_defaults(func=cmd_headless)
+
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    return args.func(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,469 @@
+# MIT License
+# Copyright (c) 2025 EveGlow
+"""
+ProjectRAX 核心逻辑（不依赖 Qt 界面组件）
+
+包含配置管理、任务执行器、日志监听器、任务检测线程以及进程保护的启动/检测。
+插件的界面部分（ui.py）与无界面守护模式（headless.py）共用这些组件。
+"""
+#region 导入模块
+from SRACore.util.logger import logger
+from SRACore.util.logger import log_emitter
+
+from .process_protector.events import DB_FILE_NAME as PROTECTOR_DB_FILE_NAME, EventStore
+from .scheduler import StaminaScheduler
+from .logwatch import LogSilenceWatchdog
+
+import atexit
+import json
+import os
+import psutil
+import socket
+import subprocess
+import threading
+import time
+#endregion
+
+
+#region 路径
+PLUGIN_DIR = os.path.dirname(os.path.abspath(__file__))
+# 配置与运行记录所在目录，可通过环境变量改到别处（日志回放工具用它隔离真实配置）
+DATA_DIR = os.environ.get("PROJECTRAX_DATA_DIR", PLUGIN_DIR)
+CONFIG_PATH = os.path.join(DATA_DIR, "config.json")
+PROTECTOR_PATH = os.path.join(PLUGIN_DIR, "process_protector", "protector.exe")
+PROTECTOR_LOCK_PATH = os.path.join(PLUGIN_DIR, "process_protector", "protector.lock")
+PROTECTOR_DB_PATH = os.path.join(PLUGIN_DIR, "process_protector", PROTECTOR_DB_FILE_NAME)
+STAMINA_LOG_PATH = os.path.join(DATA_DIR, "stamina_log.csv")
+#endregion
+
+
+#region 配置管理
+class PluginConfigManager:
+    def __init__(self):
+        super().__init__()
+        with open(CONFIG_PATH, "r", encoding="utf-8") as f:
+            self.config = json.load(f)
+        self._apply()
+
+    def _apply(self):
+        global check_task_inside
+        self.showLog = self.config["showLog"]
+        self.check_task = self.config["check_task"]
+        if self.check_task:
+            check_task_inside = True
+        self.check_delay = self.config["check_delay"]
+        self.lang = self.config["lang"]
+        self.headless = self.config.get("headless", False)
+        self.schedule_mode = self.config.get("schedule_mode", "fixed")
+
+    def reload_config(self):
+        """重新读取配置文件（命令行工具可能在插件运行时修改了它）"""
+        try:
+            with open(CONFIG_PATH, "r", encoding="utf-8") as f:
+                self.config = json.load(f)
+        except (OSError, ValueError) as e:
+            logger.warning(f"ProjectRAX: 读取配置文件失败，沿用当前配置: {e}")
+        self._apply()
+
+    def change_config(self, key, value):
+        self.config[key] = value
+        with open(CONFIG_PATH, "w", encoding="utf-8") as f:
+            json.dump(self.config, f, indent=4, ensure_ascii=False)
+#endregion
+
+
+#region 变量
+check_task_inside = False
+daily_task_completed = False
+starting_check = False
+cfgm = PluginConfigManager()
+stamina_scheduler = StaminaScheduler(cfgm, STAMINA_LOG_PATH, lambda: task_executor.is_task_running())
+task_checker_thread = None  # 任务检测线程实例
+log_watchdog = None  # 日志静默看门狗实例
+log_listener_connected = False  # 日志监听器连接状态
+#endregion
+
+
+#region 任务执行器
+class TaskExecutor:
+    """任务重新执行器"""
+
+    def __init__(self):
+        self.main_instance = None
+        self.is_executing = False
+        self.last_config = None  # 最近一次执行使用的配置方案，供重新提交任务使用
+
+    def set_main_instance(self, main_instance):
+        """设置SRA主实例引用"""
+        self.main_instance = main_instance
+
+    def execute_task(self, config_name=None):
+        """
+        执行任务
+
+        Args:
+            config_name: 配置方案名称，如果为None则使用当前配置
+        """
+        if self.is_executing:
+            logger.warning("任务正在执行中，请等待完成后再试")
+            return False
+
+        if self.main_instance is None:
+            logger.error("未找到SRA主实例，无法执行任务")
+            return False
+
+        if self.main_instance.task_thread.isRunning():
+            logger.warning("SRA主程序正在运行任务，请等待完成后再试")
+            return False
+
+        try:
+            self.is_executing = True
+            self.last_config = config_name
+            logger.info("ProjectRAX: 开始执行任务")
+
+            if config_name:
+                # 使用指定配置执行 - 设置全局配置管理器
+                from SRACore.util.config import GlobalConfigManager
+                gcm = GlobalConfigManager()
+                gcm.set('current_config', config_name)
+                logger.info(f"ProjectRAX: 切换到配置 {config_name}")
+            else:
+                # 确保使用当前配置
+                pass
+
+            # 启动任务线程
+            self.main_instance.task_thread.start()
+
+            return True
+
+        except Exception as e:
+            logger.error(f"执行任务时发生错误: {e}")
+            return False
+        finally:
+            self.is_executing = False
+
+    def is_task_running(self):
+        """SRA主程序是否正在执行任务"""
+        return self.main_instance is not None and self.main_instance.task_thread.isRunning()
+
+    def stop_task(self):
+        """停止当前任务"""
+        if self.main_instance and self.main_instance.task_thread.isRunning():
+            self.main_instance.task_thread.stop()
+            logger.info("ProjectRAX: 已请求停止任务")
+            return True
+        return False
+
+    def get_available_configs(self):
+        """获取可用的配置方案列表"""
+        try:
+            from SRACore.util.config import GlobalConfigManager
+            gcm = GlobalConfigManager()
+            return gcm.get('config_list', ['default'])
+        except Exception as e:
+            logger.error(f"获取配置列表失败: {e}")
+            return ['default']
+
+# 全局任务执行器实例
+task_executor = TaskExecutor()
+#endregion
+
+
+#region 日志监听器
+def log_message_listener(msg):
+    """
+    监听日志消息，检测任务完成状态
+
+    Args:
+        msg: 日志消息字符串
+    """
+    global daily_task_completed, starting_check
+
+    if "任务全部完成" in msg:
+        logger.info("ProjectRAX: 检测到任务全部完成信号")
+        daily_task_completed = True
+        starting_check = True  # 开始检测周期
+
+    stamina_scheduler.on_log(msg)
+
+def connect_log_listener():
+    """连接日志监听器"""
+    global log_listener_connected
+    if not log_listener_connected:
+        log_emitter.log_signal.connect(log_message_listener)
+        log_listener_connected = True
+        logger.info("ProjectRAX: 日志监听器已连接")
+#endregion
+
+
+#region 检测任务
+class TaskCheckerThread(threading.Thread):
+    def __init__(self):
+        super().__init__()
+        cfgm.reload_config()
+        self.delay = cfgm.check_delay
+        self.check_task = cfgm.check_task
+        self.running = True
+        self.next_wakeup = None  # 下一次唤醒的时间戳
+        self.wakeups = 0
+        self.idle_wakeups = 0  # 唤醒后没有执行任务的次数
+
+    def stop(self):
+        """停止检测线程"""
+        self.running = False
+        stamina_scheduler.replan_event.set()
+
+    def next_delay(self):
+        """计算距离下一次检查的秒数"""
+        fallback = cfgm.check_delay * 60
+        if cfgm.schedule_mode == "stamina":
+            return stamina_scheduler.seconds_until_next_run(fallback)
+        return fallback
+
+    def sleep_until_due(self):
+        """睡眠到下一次检查时间；开拓力模式下收到新的开拓力观测值会重新计算"""
+        while self.running:
+            delay = self.next_delay()
+            self.next_wakeup = time.time() + delay
+            stamina_scheduler.replan_event.clear()
+            if not stamina_scheduler.replan_event.wait(delay):
+                return
+            if cfgm.schedule_mode != "stamina":
+                # 固定间隔模式下不因开拓力观测提前唤醒，只需睡完剩余时间
+                remaining = self.next_wakeup - time.time()
+                if remaining > 0 and self.running:
+                    time.sleep(remaining)
+                return
+
+    def run(self):
+        global daily_task_completed, starting_check
+
+        logger.info("ProjectRAX: 任务检测线程已启动")
+
+        while self.running and self.check_task:
+            cfgm.reload_config()
+            self.check_task = cfgm.check_task
+            if not self.check_task:
+                break
+            self.wakeups += 1
+
+            if task_executor.is_task_running():
+                # SRA 正在执行任务时提交必然失败，等任务结束后的下一个周期再判断
+                self.idle_wakeups += 1
+                logger.debug("ProjectRAX: SRA正在执行任务，跳过本次检查")
+                self.sleep_until_due()
+                continue
+
+            stamina_due = cfgm.schedule_mode == "stamina" and stamina_scheduler.is_due()
+            # 检查是否需要执行每日任务，或开拓力已达到值得消耗的阈值
+            if not daily_task_completed or stamina_due:
+                if stamina_due:
+                    logger.info("ProjectRAX: 开拓力已达到阈值，开始执行")
+                else:
+                    logger.info("ProjectRAX: 检测到每日任务未完成，开始执行")
+                if task_executor.execute_task():
+                    logger.info("ProjectRAX: 任务执行已开始，等待完成信号")
+                    # 设置starting_check为True，等待任务完成信号
+                    starting_check = True
+                    stamina_scheduler.mark_run()
+                else:
+                    logger.error("ProjectRAX: 任务执行失败，将在下个周期重试")
+            else:
+                self.idle_wakeups += 1
+                logger.debug(f"ProjectRAX: 每日任务已完成（空闲唤醒 {self.idle_wakeups}/{self.wakeups}）")
+
+            # 等待到下一次检查时间
+            self.sleep_until_due()
+
+
+def start_task_checker():
+    """连接日志监听器并启动任务检测线程（已在运行时不重复启动）"""
+    global task_checker_thread
+    connect_log_listener()
+    if task_checker_thread is None or not task_checker_thread.is_alive():
+        task_checker_thread = TaskCheckerThread()
+        task_checker_thread.daemon = True
+        task_checker_thread.start()
+
+
+def stop_task_checker():
+    """停止任务检测线程"""
+    global task_checker_thread
+    if task_checker_thread is not None:
+        task_checker_thread.stop()
+        task_checker_thread = None
+
+
+def enable_task_check():
+    """
+    启用任务检测
+
+    Returns:
+        启用成功返回True，已处于启用状态返回False
+    """
+    global check_task_inside, daily_task_completed
+
+    if check_task_inside:
+        logger.warning("ProjectRAX: 任务检测已开启")
+        return False
+
+    check_task_inside = True
+    cfgm.change_config("check_task", True)
+    # 重置每日任务状态，准备重新检测
+    daily_task_completed = False
+    start_task_checker()
+    logger.info("ProjectRAX: 任务检测已启用")
+    return True
+#endregion
+
+
+#region 卡死检测
+def start_log_watchdog():
+    """配置中启用了 watchdog_enable 时，启动日志静默看门狗（已在运行时不重复启动）"""
+    global log_watchdog
+    if not cfgm.config.get("watchdog_enable", False):
+        return None
+    if log_watchdog is None or not log_watchdog.is_alive():
+        log_watchdog = LogSilenceWatchdog(
+            task_executor, cfgm.config,
+            lambda: task_checker_thread.next_wakeup if task_checker_thread is not None else None)
+        log_emitter.log_signal.connect(log_watchdog.on_log)
+        log_watchdog.start()
+        atexit.unregister(stop_log_watchdog)
+        atexit.register(stop_log_watchdog)
+    return log_watchdog
+
+
+def stop_log_watchdog():
+    """停止日志静默看门狗，线程退出时会输出一行统计"""
+    global log_watchdog
+    watchdog, log_watchdog = log_watchdog, None
+    if watchdog is None:
+        return
+    try:
+        log_emitter.log_signal.disconnect(watchdog.on_log)
+    except (RuntimeError, TypeError, ValueError):
+        pass
+    watchdog.stop()
+    watchdog.join(timeout=5)
+
+
+def on_stall(still_seconds):
+    """画面静止时，若日志看门狗已启用，由它停止并重新提交任务"""
+    if log_watchdog is not None and log_watchdog.is_alive():
+        log_watchdog.recover(f"游戏画面已 {still_seconds:.0f} 秒没有变化")
+
+
+def start_stall_detection():
+    """配置中启用了 stall_detect 时，启动画面静止检测"""
+    if cfgm.config.get("stall_detect", False):
+        # 延迟导入：stall 会加载 NumPy 与 Pillow，未启用时不应增加启动耗时与内存占用
+        from . import stall
+        stall.start_stall_watchdog(cfgm.config, task_executor.is_task_running, on_stall=on_stall)
+#endregion
+
+
+#region 进程保护
+def _query_protector(port, command, timeout):
+    """向指定端口发送一条控制命令并返回解析后的应答"""
+    with socket.create_connection(("127.0.0.1", port), timeout=timeout) as conn:
+        conn.sendall(command.encode("utf-8") + b"\n")
+        with conn.makefile("r", encoding="utf-8") as reader:
+            return json.loads(reader.readline())
+
+
+def read_protector_lock():
+    """
+    读取进程保护器写入的锁文件
+
+    Returns:
+        {"pid", "port", "started_at"}，锁文件不存在或已失效时返回None
+    """
+    try:
+        with open(PROTECTOR_LOCK_PATH, "r", encoding="utf-8") as f:
+            lock = json.load(f)
+    except (OSError, ValueError):
+        return None
+    # 保护器异常退出时锁文件可能残留，且其 PID 可能已被其它进程复用，
+    # 因此以控制端口能应答、且应答中的 PID 与锁文件一致为准
+    if not psutil.pid_exists(lock.get("pid", -1)):
+        return None
+    try:
+        reply = _query_protector(lock["port"], "status", timeout=1.0)
+    except (OSError, ValueError, KeyError):
+        return None
+    if not isinstance(reply, dict) or reply.get("pid") != lock.get("pid"):
+        return None
+    return lock
+
+
+def is_protector_running():
+    """检查进程保护器是否已在运行（读取锁文件并询问控制端口，无需遍历进程）"""
+    return read_protector_lock() is not None
+
+
+def send_protector_command(command, timeout=2.0):
+    """
+    向进程保护器的控制端口发送命令
+
+    Args:
+        command: status / restart / stop / stats
+
+    Returns:
+        保护器返回的字典，保护器未运行或通信失败时返回None
+    """
+    lock = read_protector_lock()
+    if lock is None:
+        return None
+    try:
+        return _query_protector(lock["port"], command, timeout)
+    except (OSError, ValueError, KeyError) as e:
+        logger.warning(f"ProjectRAX: 与进程保护器通信失败: {e}")
+        return None
+
+
+def get_protector_summary(days=7):
+    """
+    读取进程保护器的事件记录并汇总运行时间、崩溃次数等统计
+
+    Returns:
+        EventStore.summary 的结果，尚无记录时返回None
+    """
+    if not os.path.exists(PROTECTOR_DB_PATH):
+        return None
+    try:
+        store = EventStore(PROTECTOR_DB_PATH, readonly=True)
+        try:
+            return store.summary(days)
+        finally:
+            store.close()
+    except Exception as e:
+        logger.warning(f"ProjectRAX: 读取进程保护记录失败: {e}")
+        return None
+
+
+def launch_process_protector():
+    """
+    启动进程保护器
+
+    Returns:
+        启动成功返回True，已在运行时返回False
+    """
+    global check_task_inside
+    cfgm.reload_config()
+    if is_protector_running():
+        logger.error("ProjectRAX: 已经启用了进程守护，不能再次启动！")
+        return False
+
+    # 启动进程保护器
+    subprocess.Popen([PROTECTOR_PATH])
+
+    # 如果任务检测未启用，启用并启动
+    if not check_task_inside:
+        check_task_inside = True
+        cfgm.change_config("check_task", True)
+        start_task_checker()
+
+    logger.info("ProjectRAX: 进程保护已启用")
+    return True
+#endregion
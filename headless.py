@@ -0,0 +1,120 @@
+# MIT License
+# Copyright (c) 2025 EveGlow
+"""
+ProjectRAX 无界面守护模式
+
+在 config.json 中设置 "headless": true 后，插件不再创建透明日志窗口与任何 Qt 控件，
+而是由一个普通线程负责任务检测、日志监听与进程保护状态的协调。
+
+守护线程会周期性地重新读取 config.json，因此可以通过 cli.py 修改配置来控制它，
+并把当前状态写入 headless_status.json 供 cli.py 查询。
+"""
+#region 导入模块
+from . import core
+from .core import cfgm, DATA_DIR
+
+from SRACore.util.logger import logger
+
+import json
+import os
+import sys
+import threading
+import time
+#endregion
+
+
+#region 路径
+STATUS_PATH = os.path.join(DATA_DIR, "headless_status.json")
+#endregion
+
+
+#region 守护线程
+class HeadlessDaemon(threading.Thread):
+    """无界面守护线程：根据配置启停任务检测并定期输出状态"""
+
+    def __init__(self, poll_interval=None):
+        super().__init__(name="ProjectRAX-Headless", daemon=True)
+        cfgm.reload_config()
+        self.poll_interval = poll_interval or cfgm.config.get("headless_poll", 30)
+        self.started_at = time.time()
+        self._stop_event = threading.Event()
+
+    def stop(self):
+        """停止守护线程（不会停止正在执行的SRA任务）"""
+        self._stop_event.set()
+
+    def status(self):
+        """返回当前运行状态"""
+        checker = core.task_checker_thread
+        return {
+            "pid": os.getpid(),
+            "started_at": self.started_at,
+            "updated_at": time.time(),
+            "check_task": cfgm.check_task,
+            "check_delay": cfgm.check_delay,
+            "daily_task_completed": core.daily_task_completed,
+            "checker_alive": checker is not None and checker.is_alive(),
+            "schedule_mode": cfgm.schedule_mode,
+            "next_wakeup": checker.next_wakeup if checker is not None else None,
+            "idle_wakeups": checker.idle_wakeups if checker is not None else 0,
+            "stamina_predicted": core.stamina_scheduler.model.predict(),
+            "stamina_overflow_total": core.stamina_scheduler.overflow_total,
+            "protector": core.send_protector_command("status"),
+            "protector_history": core.get_protector_summary(7),
+            "stall": self.stall_stats(),
+            "watchdog": core.log_watchdog.stats() if core.log_watchdog else None,
+        }
+
+    @staticmethod
+    def stall_stats():
+        """画面静止检测的统计；未启用时不导入 stall 模块"""
+        stall = sys.modules.get(f"{__package__}.stall")
+        if stall is None or stall.stall_watchdog is None:
+            return None
+        return stall.stall_watchdog.detector.stats()
+
+    def reconcile(self):
+        """使任务检测线程的状态与配置保持一致"""
+        cfgm.reload_config()
+        checker = core.task_checker_thread
+        checker_alive = checker is not None and checker.is_alive()
+        if cfgm.check_task and not checker_alive:
+            core.start_task_checker()
+            logger.info("ProjectRAX: [无界面] 任务检测已启动")
+        elif not cfgm.check_task and checker_alive:
+            core.stop_task_checker()
+            core.check_task_inside = False
+            logger.info("ProjectRAX: [无界面] 任务检测已停止")
+
+    def write_status(self):
+        try:
+            with open(STATUS_PATH, "w", encoding="utf-8") as f:
+                json.dump(self.status(), f, indent=4)
+        except OSError as e:
+            logger.warning(f"ProjectRAX: [无界面] 写入状态文件失败: {e}")
+
+    def run(self):
+        logger.info("ProjectRAX: 无界面守护模式已启动")
+        core.connect_log_listener()
+        while not self._stop_event.is_set():
+            try:
+                self.reconcile()
+                self.write_status()
+            except Exception as e:
+                logger.error(f"ProjectRAX: [无界面] 守护循环出错: {e}")
+            self._stop_event.wait(self.poll_interval)
+        logger.info("ProjectRAX: 无界面守护模式已退出")
+
+
+# 全局守护线程实例
+headless_daemon = None
+
+
+def start_headless():
+    """启动无界面守护线程（已在运行时不重复启动）"""
+    global headless_daemon
+    if headless_daemon is None or not headless_daemon.is_alive():
+        headless_daemon = HeadlessDaemon()
+        headless_daemon.start()
+    return headless_daemon
+#endregion
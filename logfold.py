@@ -0,0 +1,167 @@
+# MIT License
+# Copyright (c) 2025 EveGlow
+"""
+ProjectRAX 日志折叠与限流
+
+位于透明日志窗口之前：把连续重复（或仅数字不同）的日志折叠成一行并附带 ×N 计数，
+并对每个日志级别做令牌桶限流，被丢弃的行以一条汇总提示代替。
+输出的是渲染操作列表，由窗口负责执行，因此本模块不依赖 Qt，可在回放工具中单独测量。
+"""
+#region 导入模块
+import re
+import time
+#endregion
+
+
+#region 常量
+DISPLAY_LEVELS = ("INFO", "WARNING", "ERROR", "SUCCESS")  # 透明日志窗口显示的日志级别
+# 每个级别的 (每秒令牌数, 桶容量)，None 表示不限流
+DEFAULT_RATE_LIMITS = {
+    "INFO": (5, 20),
+    "WARNING": (5, 20),
+    "ERROR": None,
+    "SUCCESS": None,
+}
+_NUMBER_PATTERN = re.compile(r"\d+(?:\.\d+)?")
+#endregion
+
+
+#region 工具
+def parse_log_line(msg):
+    """
+    拆分日志行
+
+    Returns:
+        (时间, 级别, 消息)，格式不符时返回None
+    """
+    parts = msg.split(" ", 3)
+    if len(parts) < 3:
+        return None
+    return parts[1], parts[2], parts[3] if len(parts) > 3 else ""
+
+
+def fold_key(level, message):
+    """折叠用的比较键：忽略数字差异，使“重试第1次/第2次”之类的行也能折叠"""
+    return level.upper(), _NUMBER_PATTERN.sub("#", message.strip())
+
+
+class TokenBucket:
+    """令牌桶限流器"""
+
+    def __init__(self, rate, burst):
+        self.rate = rate
+        self.burst = burst
+        self.tokens = burst
+        self.updated_at = None
+
+    def allow(self, now):
+        if self.updated_at is not None:
+            self.tokens = min(self.burst, self.tokens + (now - self.updated_at) * self.rate)
+        self.updated_at = now
+        if self.tokens >= 1:
+            self.tokens -= 1
+            return True
+        return False
+#endregion
+
+
+#region 折叠器
+class LogFolder:
+    """
+    日志折叠与限流阶段
+
+    feed() / flush() 返回渲染操作列表，每个操作是以下元组之一：
+        ("append", 时间, 级别, 消息)     追加一行
+        ("count", 次数, 时间, 消息)      把最后一行替换为最近一次的内容并附带 ×次数
+        ("dropped", 级别, 行数)          追加一条“已丢弃N行”汇总
+    """
+
+    def __init__(self, rate_limits=None):
+        limits = DEFAULT_RATE_LIMITS if rate_limits is None else rate_limits
+        self.buckets = {level: TokenBucket(*limit) for level, limit in limits.items() if limit}
+        self.dropped = {}  # 尚未汇总的丢弃行数
+        self.last_key = None
+        self.latest = None  # 当前折叠行最近一次的 (时间, 消息)
+        self.count = 0  # 当前折叠行的重复次数
+        self.rendered_count = 0  # 已显示在窗口上的重复次数
+        # 统计
+        self.lines_in = 0
+        self.renders = 0
+        self.folded = 0
+        self.dropped_total = 0
+
+    def reset(self):
+        """窗口重建后，最后一行已不存在，不能再更新它的计数"""
+        self.last_key = None
+        self.latest = None
+        self.count = 0
+        self.rendered_count = 0
+
+    def flush(self):
+        """把尚未显示的重复计数写到最后一行上，并输出各级别尚未汇总的丢弃行数"""
+        ops = []
+        if self.count > self.rendered_count:
+            self.rendered_count = self.count
+            self.renders += 1
+            ops.append(("count", self.count, *self.latest))
+        for level in list(self.dropped):
+            ops.extend(self._dropped_ops(level))
+        return ops
+
+    def _dropped_ops(self, level):
+        pending = self.dropped.pop(level, 0)
+        if not pending:
+            return []
+        self.renders += 1
+        # 汇总行成了最后一行，之后的重复行不能再更新它的计数
+        self.last_key = None
+        return [("dropped", level, pending)]
+
+    def feed(self, msg, now=None, limit=True):
+        """
+        处理一行日志
+
+        Args:
+            limit: 为False时不经过令牌桶限流（用于回放窗口创建前缓冲的日志）
+        """
+        parsed = parse_log_line(msg)
+        if parsed is None:
+            return []
+        log_time, level, message = parsed
+        if level.upper() not in DISPLAY_LEVELS:
+            return []
+        self.lines_in += 1
+
+        key = fold_key(level, message)
+        if key == self.last_key:
+            self.latest = (log_time, message)
+            self.count += 1
+            self.folded += 1
+            return []
+
+        now = time.monotonic() if now is None else now
+        bucket = self.buckets.get(level.upper()) if limit else None
+        if bucket is not None and not bucket.allow(now):
+            self.dropped[level.upper()] = self.dropped.get(level.upper(), 0) + 1
+            self.dropped_total += 1
+            # 被丢弃的行打断了连续重复，之后的同类行不能再折叠到前一行上
+            self.last_key = None
+            return []
+
+        ops = self.flush()
+        ops.append(("append", log_time, level, message))
+        self.renders += 1
+        self.last_key = key
+        self.latest = (log_time, message)
+        self.count = self.rendered_count = 1
+        return ops
+
+    def stats(self):
+        return {
+            "lines_in": self.lines_in,
+            "renders": self.renders,
+            "saved": self.lines_in - self.renders,
+            "folded": self.folded,
+            "dropped": self.dropped_total,
+        }
+#endregion
@@ -0,0 +1,211 @@
+# MIT License
+# Copyright (c) 2025 EveGlow
+"""
+ProjectRAX 日志静默看门狗
+
+SRA 执行任务期间，记录最后一条“有意义”日志的时间（忽略 DEBUG、插件自身的日志，
+以及与最近几行重复的行，这样 A、B、A、B 交替的识别循环也不算有进展）。
+静默时间超过当前任务阶段的预算时，判定任务卡死：调用 TaskExecutor.stop_task() 停止任务，
+等待任务线程退出后重新提交同一次运行，并统计触发次数与挽回的时间。
+同一次运行最多重新提交 watchdog_max_retries 次，超过后只停止任务，不再重新提交。
+运行期间每隔 watchdog_report_minutes 分钟把统计写入一行日志，界面模式下也能看到。
+
+任务阶段通过日志关键字识别，例如配置 {"模拟宇宙": 1800} 后，
+出现包含“模拟宇宙”的日志即切换到该阶段，预算为 1800 秒。
+"""
+#region 导入模块
+from SRACore.util.logger import logger
+
+from .logfold import fold_key, parse_log_line
+
+from collections import deque
+import threading
+import time
+#endregion
+
+
+#region 常量
+DEFAULT_PHASE = "default"
+IGNORED_LEVELS = ("DEBUG", "TRACE")
+#endregion
+
+
+#region 看门狗
+class LogSilenceWatchdog(threading.Thread):
+    """
+    日志静默看门狗
+
+    Args:
+        executor: TaskExecutor 实例
+        config: 插件配置字典
+        next_check_time: 返回任务检测线程下一次唤醒时间戳（或None）的函数，用于估算挽回的时间
+    """
+
+    def __init__(self, executor, config, next_check_time=None):
+        super().__init__(name="ProjectRAX-Watchdog", daemon=True)
+        self.executor = executor
+        self.next_check_time = next_check_time
+        self.apply_config(config)
+        self.phase = DEFAULT_PHASE
+        self.recent_keys = deque(maxlen=self.repeat_window)  # 最近出现过的日志折叠键
+        self.last_meaningful_at = time.monotonic()
+        self.task_running = False
+        self.retries = 0  # 当前这次运行已重新提交的次数
+        self.resubmitted = False  # 下一个开始的任务是否为看门狗重新提交的
+        self._stop_event = threading.Event()
+        self._lock = threading.Lock()
+        self._recover_lock = threading.Lock()  # 日志看门狗与画面静止检测可能同时触发
+        # 统计
+        self.fires = 0
+        self.fires_by_phase = {}
+        self.failed_stops = 0
+        self.resubmits = 0
+        self.gave_up = 0  # 达到重试上限后放弃重新提交的次数
+        self.silent_seconds = 0.0  # 触发时累计的静默时间
+        self.recovered_seconds = 0.0
+
+    def apply_config(self, config):
+        self.default_budget = config.get("watchdog_budget_seconds", 900)
+        self.phase_budgets = config.get("watchdog_phases", {})
+        self.check_interval = config.get("watchdog_check_seconds", 10)
+        self.stop_timeout = config.get("watchdog_stop_timeout", 60)
+        self.repeat_window = config.get("watchdog_repeat_window", 8)
+        self.max_retries = config.get("watchdog_max_retries", 2)
+        self.report_interval = config.get("watchdog_report_minutes", 60) * 60
+
+    def budget(self):
+        return self.phase_budgets.get(self.phase, self.default_budget)
+
+    def stop(self):
+        self._stop_event.set()
+
+    def on_log(self, msg, now=None):
+        """日志信号入口：只有非 DEBUG、非插件自身、且不在最近几行中出现过的日志才算有进展"""
+        if "ProjectRAX:" in msg:
+            # 检测线程、画面静止检测和看门狗自己的日志不代表任务有进展
+            return
+        parsed = parse_log_line(msg)
+        if parsed is None:
+            return
+        _, level, message = parsed
+        if level.upper() in IGNORED_LEVELS:
+            return
+        key = fold_key(level, message)
+        with self._lock:
+            if key in self.recent_keys:
+                return
+            self.recent_keys.append(key)
+            self.last_meaningful_at = time.monotonic() if now is None else now
+            for keyword in self.phase_budgets:
+                if keyword in message:
+                    self.phase = keyword
+                    break
+
+    def check(self, now=None):
+        """
+        执行一次检查
+
+        Returns:
+            本次是否判定任务卡死并成功重新提交
+        """
+        now = time.monotonic() if now is None else now
+        running = self.executor.is_task_running()
+        if running and not self.task_running:
+            # 新任务开始：重新计时并回到默认阶段
+            with self._lock:
+                self.phase = DEFAULT_PHASE
+                self.recent_keys.clear()
+                self.last_meaningful_at = now
+            if not self.resubmitted:
+                self.retries = 0
+            self.resubmitted = False
+        self.task_running = running
+        if not running:
+            return False
+
+        silence = now - self.last_meaningful_at
+        if silence < self.budget():
+            return False
+        return self.recover(f"阶段 {self.phase} 已 {silence:.0f} 秒没有新的日志（预算 {self.budget()} 秒）", silence)
+
+    def recover(self, reason, silence=None):
+        """停止卡住的任务并重新提交"""
+        if not self._recover_lock.acquire(blocking=False):
+            return False
+        try:
+            return self._recover(reason, silence)
+        finally:
+            self._recover_lock.release()
+
+    def _recover(self, reason, silence):
+        phase = self.phase
+        if silence is None:
+            silence = time.monotonic() - self.last_meaningful_at
+        logger.warning(f"ProjectRAX: 任务疑似卡死：{reason}，正在停止并重新执行")
+        self.fires += 1
+        self.fires_by_phase[phase] = self.fires_by_phase.get(phase, 0) + 1
+        self.silent_seconds += silence
+
+        self.executor.stop_task()
+        deadline = time.monotonic() + self.stop_timeout
+        while self.executor.is_task_running():
+            if time.monotonic() > deadline or self._stop_event.is_set():
+                self.failed_stops += 1
+                # 重新计时，等到再过一个预算仍无进展时才再次尝试，而不是每个检查周期都阻塞一次
+                with self._lock:
+                    self.last_meaningful_at = time.monotonic()
+                logger.error("ProjectRAX: 任务线程未能在限定时间内停止，放弃重新执行")
+                return False
+            time.sleep(1)
+
+        # 以前卡住的任务会一直占用任务线程，至少要等到任务检测线程下次唤醒才可能重试
+        next_check = self.next_check_time() if self.next_check_time else None
+        if next_check is not None:
+            self.recovered_seconds += max(0.0, next_check - time.time())
+
+        self.task_running = False
+        if self.retries >= self.max_retries:
+            self.gave_up += 1
+            logger.error(f"ProjectRAX: 本次运行已重新提交 {self.retries} 次仍然卡死，不再重新提交")
+            return False
+        if self.executor.execute_task(self.executor.last_config):
+            self.retries += 1
+            self.resubmits += 1
+            self.resubmitted = True
+            logger.info(f"ProjectRAX: 已重新提交任务（第 {self.retries}/{self.max_retries} 次）")
+            return True
+        logger.error("ProjectRAX: 重新提交任务失败")
+        return False
+
+    def stats(self, now=None):
+        now = time.monotonic() if now is None else now
+        return {
+            "phase": self.phase,
+            "silence": now - self.last_meaningful_at if self.task_running else 0.0,
+            "fires": self.fires,
+            "fires_by_phase": dict(self.fires_by_phase),
+            "failed_stops": self.failed_stops,
+            "resubmits": self.resubmits,
+            "gave_up": self.gave_up,
+            "silent_seconds": self.silent_seconds,
+            "recovered_seconds": self.recovered_seconds,
+        }
+
+    def summary(self):
+        """统计的单行摘要，用于日志"""
+        return (f"触发 {self.fires} 次（停止失败 {self.failed_stops}，重新提交 {self.resubmits}，"
+                f"放弃 {self.gave_up}），累计静默 {self.silent_seconds:.0f} 秒，挽回 {self.recovered_seconds:.0f} 秒")
+
+    def run(self):
+        logger.info("ProjectRAX: 日志静默看门狗已启动")
+        next_report = time.monotonic() + self.report_interval
+        while not self._stop_event.wait(self.check_interval):
+            try:
+                self.check()
+            except Exception as e:
+                logger.error(f"ProjectRAX: 日志静默看门狗出错: {e}")
+            if self.report_interval and time.monotonic() >= next_report:
+                next_report = time.monotonic() + self.report_interval
+                logger.info(f"ProjectRAX: 日志静默看门狗统计：{self.summary()}")
+        logger.info(f"ProjectRAX: 日志静默看门狗已停止：{self.summary()}")
+#endregion
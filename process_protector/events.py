@@ -0,0 +1,150 @@
+# -*- coding: utf-8 -*-
+"""
+Append-only supervision event log for the process protector.
+
+Events are stored in a small SQLite database (protector_events.db) next to the protector:
+
+    start     protector began supervising
+    stop      protector stopped supervising
+    elevate   protector relaunched itself with Administrator rights
+    launch    SRA.exe was launched (pid)
+    exit      SRA.exe exited (code)
+    restart   SRA.exe is being relaunched (code: exit code that caused it, NULL if requested)
+
+The plugin opens the same file read-only to show uptime, crash rate and relaunch latency.
+This module only uses the standard library so it can be bundled into protector.exe.
+"""
+
+from __future__ import annotations
+
+import sqlite3
+import time
+from pathlib import Path
+
+DB_FILE_NAME = "protector_events.db"
+
+EVENT_KINDS = ("start", "stop", "elevate", "launch", "exit", "restart")
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS events (
+    id   INTEGER PRIMARY KEY,
+    ts   REAL    NOT NULL,
+    kind TEXT    NOT NULL,
+    pid  INTEGER,
+    code INTEGER
+);
+CREATE INDEX IF NOT EXISTS events_ts ON events (ts);
+"""
+
+
+class EventStore:
+    def __init__(self, path: str | Path, readonly: bool = False) -> None:
+        self.path = Path(path)
+        if readonly:
+            self.conn = sqlite3.connect(f"file:{self.path.as_posix()}?mode=ro", uri=True)
+        else:
+            self.conn = sqlite3.connect(str(self.path))
+            self.conn.executescript(_SCHEMA)
+
+    def close(self) -> None:
+        self.conn.close()
+
+    # -----------------------------
+    # Writing
+    # -----------------------------
+
+    def record(self, kind: str, pid: int | None = None, code: int | None = None, ts: float | None = None) -> None:
+        if kind not in EVENT_KINDS:
+            raise ValueError(f"unknown event kind: {kind}")
+        with self.conn:
+            self.conn.execute(
+                "INSERT INTO events (ts, kind, pid, code) VALUES (?, ?, ?, ?)",
+                (time.time() if ts is None else ts, kind, pid, code),
+            )
+
+    # -----------------------------
+    # Queries
+    # -----------------------------
+
+    def events(self, since: float = 0.0) -> list[tuple[float, str, int | None, int | None]]:
+        return self.conn.execute(
+            "SELECT ts, kind, pid, code FROM events WHERE ts >= ? ORDER BY ts, id", (since,)
+        ).fetchall()
+
+    def _span_total(self, since: float, now: float, opens: tuple[str, ...], closes: tuple[str, ...]) -> float:
+        """Sum of time between an opening event and the next closing event, clipped to [since, now]."""
+        # Include the last relevant event before the window so a span that started earlier is counted.
+        kinds = opens + closes
+        row = self.conn.execute(
+            f"SELECT ts, kind FROM events WHERE ts < ? AND kind IN ({', '.join('?' * len(kinds))}) "
+            "ORDER BY ts DESC, id DESC LIMIT 1",
+            (since, *kinds),
+        ).fetchone()
+        rows = ([row] if row else []) + [(ts, kind) for ts, kind, _, _ in self.events(since)]
+
+        total = 0.0
+        opened_at = None
+        for ts, kind in rows:
+            if kind in closes and opened_at is not None:
+                total += max(0.0, ts - max(opened_at, since))
+                opened_at = None
+            if kind in opens:
+                opened_at = ts
+        if opened_at is not None:
+            total += max(0.0, now - max(opened_at, since))
+        return total
+
+    def summary(self, days: float = 7.0, now: float | None = None) -> dict:
+        """
+        Aggregate statistics over the last `days` days.
+
+        uptime_percent       share of supervised time during which SRA.exe was running
+        crashes              abnormal exits that triggered a restart (requested restarts excluded)
+        crashes_per_day      crashes / days covered by the window
+        mean_relaunch_secs   average time from a crash to the next launch
+        mtbf_secs            SRA running time / crashes
+        """
+        now = time.time() if now is None else now
+        since = now - days * 86400
+
+        # A new "start" also closes spans left open by a protector that died without "stop".
+        supervised = self._span_total(since, now, ("start",), ("stop", "start"))
+        running = self._span_total(since, now, ("launch",), ("exit", "stop", "start"))
+
+        launches, crashes, restarts, elevations = self.conn.execute(
+            "SELECT "
+            "  COALESCE(SUM(kind = 'launch'), 0), "
+            "  COALESCE(SUM(kind = 'restart' AND code IS NOT NULL), 0), "
+            "  COALESCE(SUM(kind = 'restart'), 0), "
+            "  COALESCE(SUM(kind = 'elevate'), 0) "
+            "FROM events WHERE ts >= ?",
+            (since,),
+        ).fetchone()
+
+        # Pair each crash-triggered restart with the launch that follows it.
+        mean_relaunch = self.conn.execute(
+            "SELECT AVG(next_launch - ts) FROM ("
+            "  SELECT e.ts AS ts, ("
+            "    SELECT MIN(l.ts) FROM events l WHERE l.kind = 'launch' AND l.ts >= e.ts"
+            "  ) AS next_launch"
+            "  FROM events e WHERE e.kind = 'restart' AND e.code IS NOT NULL AND e.ts >= ?"
+            ") WHERE next_launch IS NOT NULL",
+            (since,),
+        ).fetchone()[0]
+
+        first = self.conn.execute("SELECT MIN(ts) FROM events WHERE ts >= ?", (since,)).fetchone()[0]
+        covered_days = max((now - first) / 86400, 1 / 24) if first is not None else 0.0
+
+        return {
+            "days": days,
+            "supervised_secs": supervised,
+            "running_secs": running,
+            "uptime_percent": 100.0 * running / supervised if supervised else None,
+            "launches": launches,
+            "crashes": crashes,
+            "restarts": restarts,
+            "elevations": elevations,
+            "crashes_per_day": crashes / covered_days if covered_days else None,
+            "mean_relaunch_secs": mean_relaunch,
+            "mtbf_secs": running / crashes if crashes else None,
+        }
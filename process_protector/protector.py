@@ -8,18 +8,31 @@ Requirements:
 2. If exit code is non-zero (abnormal), restart SRA.exe; if zero, exit protector.
 
 Note: SRA.exe must run as Administrator; otherwise it will spawn an elevated instance and quit itself.
+
+The supervisor runs on an asyncio loop, so waiting for SRA.exe never blocks control requests.
+While running it writes protector.lock (JSON: pid, port, started_at) next to the executable and
+serves a line-based control socket on 127.0.0.1:<port>. Each request is one command line
+(status / restart / stop / stats) and each reply is one JSON line.
+Launch, exit, restart and elevation events are appended to protector_events.db (see events.py).
 """
 
 from __future__ import annotations
 
+import asyncio
 import ctypes
 import ctypes.wintypes as wt
+import json
 import os
 import sys
 import time
-import subprocess
 from pathlib import Path
 
+from events import DB_FILE_NAME, EventStore
+
+LOCK_FILE_NAME = "protector.lock"
+RESTART_DELAY = 2
+WAIT_SRA_INTERVAL = 3
+
 # -----------------------------
 # Admin detection and elevation
 # -----------------------------
@@ -70,68 +83,268 @@ def relaunch_as_admin() -> None:
     os._exit(0)
 
 
+# -----------------------------
+# Paths and lock file
+# -----------------------------
+
+def protector_dir() -> Path:
+    """Directory of protector.exe (frozen) or protector.py (script)."""
+    if getattr(sys, "frozen", False):
+        return Path(sys.executable).resolve().parent
+    return Path(__file__).resolve().parent
+
+
+def lock_path() -> Path:
+    return protector_dir() / LOCK_FILE_NAME
+
+
+def read_lock() -> dict | None:
+    try:
+        return json.loads(lock_path().read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return None
+
+
+def open_event_store() -> EventStore | None:
+    """Open the event log; supervision keeps working even if it cannot be written."""
+    try:
+        return EventStore(protector_dir() / DB_FILE_NAME)
+    except Exception as e:
+        print(f"[protector] Event log unavailable: {e}")
+        return None
+
+
+def write_lock(port: int) -> None:
+    data = {"pid": os.getpid(), "port": port, "started_at": time.time()}
+    lock_path().write_text(json.dumps(data), encoding="utf-8")
+
+
+def remove_lock() -> None:
+    lock = read_lock()
+    # Only remove our own lock; a newer instance may have replaced it.
+    if lock is not None and lock.get("pid") == os.getpid():
+        try:
+            lock_path().unlink()
+        except OSError:
+            pass
+
+
+async def send_command(command: str, port: int, timeout: float = 2.0) -> dict:
+    """Send one control command to a running protector and return its JSON reply."""
+    reader, writer = await asyncio.wait_for(asyncio.open_connection("127.0.0.1", port), timeout)
+    try:
+        writer.write(command.encode("utf-8") + b"\n")
+        await writer.drain()
+        line = await asyncio.wait_for(reader.readline(), timeout)
+        return json.loads(line)
+    finally:
+        writer.close()
+
+
+async def another_instance_running() -> bool:
+    """A lock file alone may be stale; only trust it if its control socket answers."""
+    lock = read_lock()
+    if lock is None:
+        return False
+    try:
+        await send_command("status", lock["port"], timeout=1.0)
+        return True
+    except (OSError, ValueError, KeyError, asyncio.TimeoutError):
+        return False
+
+
 # -----------------------------
 # SRA launching and monitoring
 # -----------------------------
 
 def find_sra_exe() -> Path:
-    """Return the path of ..\\..\\..\\SRA.exe relative to this file."""
-    here = Path(__file__).resolve()
+    """Return the path of ..\\..\\..\\SRA.exe relative to the protector directory."""
     # process_protector -> ProjectRAX (1) -> plugins (2) -> repo root (3)
-    target = here.parents[3] / "SRA.exe"
+    target = protector_dir().parents[2] / "SRA.exe"
     return target
 
 
-def launch_sra(sra_path: Path) -> subprocess.Popen:
+async def launch_sra(sra_path: Path) -> asyncio.subprocess.Process:
     """Launch SRA.exe as a child process (in elevated context if protector is elevated)."""
     # Inherit elevated token from protector, so SRA runs as admin.
     # Use cwd at SRA.exe directory to ensure relative paths inside SRA work.
-    return subprocess.Popen(
-        [str(sra_path)],
-        cwd=str(sra_path.parent),
-        shell=False,
-        creationflags=0,
-    )
-
-
-def monitor_and_restart_loop() -> None:
-    sra_path = find_sra_exe()
-    if not sra_path.exists():
-        print(f"[protector] SRA.exe not found: {sra_path}")
-    
-    while True:
-        # Wait until SRA.exe exists
-        while not sra_path.exists():
-            print("[protector] Waiting for SRA.exe to appear...")
-            time.sleep(3)
+    return await asyncio.create_subprocess_exec(str(sra_path), cwd=str(sra_path.parent))
+
+
+class Protector:
+    """Supervises SRA.exe and serves the local control socket."""
 
+    def __init__(self, sra_path: Path, store: EventStore | None = None) -> None:
+        self.sra_path = sra_path
+        self.store = store
+        self.proc: asyncio.subprocess.Process | None = None
+        self.started_at = time.time()
+        self.child_started_at: float | None = None
+        self.launches = 0
+        self.restarts = 0
+        self.abnormal_exits = 0
+        self.last_exit_code: int | None = None
+        self.state = "starting"
+        self._stop = asyncio.Event()
+        self._restart_requested = False
+
+    # ---- supervision ----
+
+    def record(self, kind: str, pid: int | None = None, code: int | None = None) -> None:
+        if self.store is None:
+            return
         try:
-            print(f"[protector] Launching: {sra_path}")
-            proc = launch_sra(sra_path)
+            self.store.record(kind, pid=pid, code=code)
         except Exception as e:
-            print(f"[protector] Failed to launch SRA.exe: {e}")
-            time.sleep(3)
-            continue
+            print(f"[protector] Failed to record {kind} event: {e}")
 
+    async def _sleep_or_stop(self, seconds: float) -> bool:
+        """Sleep, returning True early if a stop was requested."""
         try:
-            rc = proc.wait()
+            await asyncio.wait_for(self._stop.wait(), seconds)
+            return True
+        except asyncio.TimeoutError:
+            return False
+
+    async def supervise(self) -> None:
+        if not self.sra_path.exists():
+            print(f"[protector] SRA.exe not found: {self.sra_path}")
+
+        while not self._stop.is_set():
+            # Wait until SRA.exe exists
+            if not self.sra_path.exists():
+                self.state = "waiting"
+                print("[protector] Waiting for SRA.exe to appear...")
+                if await self._sleep_or_stop(WAIT_SRA_INTERVAL):
+                    break
+                continue
+
+            try:
+                print(f"[protector] Launching: {self.sra_path}")
+                self.proc = await launch_sra(self.sra_path)
+            except Exception as e:
+                print(f"[protector] Failed to launch SRA.exe: {e}")
+                if await self._sleep_or_stop(WAIT_SRA_INTERVAL):
+                    break
+                continue
+
+            self.launches += 1
+            self.record("launch", pid=self.proc.pid)
+            self.child_started_at = time.time()
+            self.state = "running"
+
+            # Wait for either the child to exit or a stop request, without blocking the loop.
+            wait_task = asyncio.ensure_future(self.proc.wait())
+            stop_task = asyncio.ensure_future(self._stop.wait())
+            await asyncio.wait({wait_task, stop_task}, return_when=asyncio.FIRST_COMPLETED)
+            stop_task.cancel()
+            if not wait_task.done():
+                # Stop requested: leave SRA running, only stop supervising it.
+                wait_task.cancel()
+                break
+
+            rc = wait_task.result()
+            self.last_exit_code = rc
+            self.child_started_at = None
+            self.proc = None
             print(f"[protector] SRA.exe exited with code: {rc}")
-        except KeyboardInterrupt:
-            print("[protector] Interrupted by user, exiting protector.")
-            break
-        except Exception as e:
-            print(f"[protector] Error while waiting SRA.exe: {e}")
-            rc = -1
-
-        # Normal exit (0) -> do not restart; Abnormal -> restart
-        if rc == 0:
-            print("[protector] Normal exit detected. Protector will exit.")
-            break
-        else:
+            self.record("exit", code=rc)
+
+            if self._restart_requested:
+                self._restart_requested = False
+                self.restarts += 1
+                self.record("restart")
+                print("[protector] Restart requested. Relaunching SRA.exe...")
+                continue
+
+            # Normal exit (0) -> do not restart; Abnormal -> restart
+            if rc == 0:
+                print("[protector] Normal exit detected. Protector will exit.")
+                break
+            self.abnormal_exits += 1
+            self.restarts += 1
+            self.record("restart", code=rc)
+            self.state = "restarting"
             print("[protector] Abnormal exit detected. Restarting SRA.exe...")
-            time.sleep(2)
+            if await self._sleep_or_stop(RESTART_DELAY):
+                break
             # loop continues and relaunches
 
+        self.state = "stopped"
+        self._stop.set()
+
+    # ---- control socket ----
+
+    def status(self) -> dict:
+        return {
+            "state": self.state,
+            "pid": os.getpid(),
+            "child_pid": self.proc.pid if self.proc is not None else None,
+            "sra_path": str(self.sra_path),
+        }
+
+    def stats(self) -> dict:
+        now = time.time()
+        return {
+            "uptime": now - self.started_at,
+            "child_uptime": now - self.child_started_at if self.child_started_at else 0.0,
+            "launches": self.launches,
+            "restarts": self.restarts,
+            "abnormal_exits": self.abnormal_exits,
+            "last_exit_code": self.last_exit_code,
+            "history": self.store.summary() if self.store is not None else None,
+        }
+
+    def restart(self) -> dict:
+        if self.proc is None or self.proc.returncode is not None:
+            return {"ok": False, "error": "SRA.exe is not running"}
+        self._restart_requested = True
+        self.proc.terminate()
+        return {"ok": True}
+
+    def stop(self) -> dict:
+        self._stop.set()
+        return {"ok": True}
+
+    async def handle_client(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        commands = {"status": self.status, "stats": self.stats, "restart": self.restart, "stop": self.stop}
+        try:
+            line = await asyncio.wait_for(reader.readline(), 5)
+            command = line.decode("utf-8", errors="replace").strip().lower()
+            handler = commands.get(command)
+            if handler is None:
+                reply = {"ok": False, "error": f"unknown command: {command!r}"}
+            else:
+                reply = handler()
+            writer.write(json.dumps(reply).encode("utf-8") + b"\n")
+            await writer.drain()
+        except (OSError, asyncio.TimeoutError):
+            pass
+        finally:
+            writer.close()
+
+
+async def serve() -> None:
+    if await another_instance_running():
+        print("[protector] Another protector instance is already running. Exiting.")
+        return
+
+    store = open_event_store()
+    protector = Protector(find_sra_exe(), store)
+    server = await asyncio.start_server(protector.handle_client, "127.0.0.1", 0)
+    port = server.sockets[0].getsockname()[1]
+    write_lock(port)
+    print(f"[protector] Control socket listening on 127.0.0.1:{port}")
+    protector.record("start")
+    try:
+        async with server:
+            await protector.supervise()
+    finally:
+        protector.record("stop")
+        remove_lock()
+        if store is not None:
+            store.close()
+
 
 # -----------------------------
 # Entry point
@@ -142,12 +355,20 @@ def main() -> None:
         print("[protector] This protector is intended for Windows.")
     if not is_user_an_admin():
         print("[protector] Not elevated. Relaunching as admin...")
+        store = open_event_store()
+        if store is not None:
+            store.record("elevate")
+            store.close()
         relaunch_as_admin()
         return  # Unreachable; relaunch_as_admin exits current process
 
     print("[protector] Running with Administrator privileges.")
-    monitor_and_restart_loop()
+    try:
+        asyncio.run(serve())
+    except KeyboardInterrupt:
+        print("[protector] Interrupted by user, exiting protector.")
+        remove_lock()
 
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
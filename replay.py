@@ -0,0 +1,366 @@
+# MIT License
+# Copyright (c) 2025 EveGlow
+"""
+ProjectRAX 日志回放工具
+
+读取一份保存下来的 SRA 日志文件，通过 SRACore 的 log_emitter（或其替代实现）重新发送每一行，
+用来驱动任务完成监听器、透明日志窗口等日志处理器，无需真正运行几十分钟的 SRA。
+
+    python replay.py sra.log                  # 以最快速度回放，只驱动核心监听器
+    python replay.py sra.log --speed 1        # 按日志原始时间间隔回放
+    python replay.py sra.log --speed 60       # 以 60 倍速回放
+    QT_QPA_PLATFORM=offscreen python replay.py sra.log --handler listener --handler overlay
+
+结束后输出吞吐量以及每个处理器的单行处理耗时。
+在 SRA 环境之外运行时，会自动装入 SRACore 中用到的几个模块的替代实现。
+"""
+import argparse
+import importlib
+import logging
+import os
+import shutil
+import sys
+import tempfile
+import time
+import traceback
+import types
+
+PLUGIN_DIR = os.path.dirname(os.path.abspath(__file__))
+PACKAGE_NAME = "projectrax_replay"
+
+
+#region 替代的 SRACore 组件
+class ReplaySignal:
+    """与 Qt Signal 接口一致的简易信号：connect / disconnect / emit"""
+
+    def __init__(self):
+        self.slots = []
+
+    def connect(self, slot):
+        self.slots.append(slot)
+
+    def disconnect(self, slot=None):
+        if slot is None:
+            self.slots.clear()
+        else:
+            self.slots.remove(slot)
+
+    def emit(self, msg):
+        for slot in self.slots:
+            slot(msg)
+
+
+class ReplayLogEmitter:
+    """替代 SRACore.util.logger.log_emitter"""
+
+    def __init__(self):
+        self.log_signal = ReplaySignal()
+
+
+def install_sracore_standins():
+    """
+    SRACore 不可用时，向 sys.modules 注册插件用到的最小替代模块
+
+    Returns:
+        注册了替代模块返回True，使用真实 SRACore 时返回False
+    """
+    try:
+        import SRACore.util.logger  # noqa: F401
+        return False
+    except ImportError:
+        pass
+
+    sracore = types.ModuleType("SRACore")
+    util = types.ModuleType("SRACore.util")
+    logger_mod = types.ModuleType("SRACore.util.logger")
+    logger_mod.logger = logging.getLogger("ProjectRAX.replay")
+    logger_mod.log_emitter = ReplayLogEmitter()
+
+    system_mod = types.ModuleType("SRACore.util.system")
+    system_mod.is_process_running = lambda name: True
+
+    operator_mod = types.ModuleType("SRACore.util.operator")
+
+    class Operator:
+        zoom = 1
+
+        def get_win_region(self):
+            return None
+
+    operator_mod.Operator = Operator
+
+    plugin_mod = types.ModuleType("SRACore.util.plugin")
+
+    class PluginBase:
+        def __init__(self, name):
+            self.name = name
+
+    plugin_mod.PluginBase = PluginBase
+
+    sracore.util = util
+    util.logger = logger_mod
+    util.system = system_mod
+    util.operator = operator_mod
+    util.plugin = plugin_mod
+    sys.modules.update({
+        "SRACore": sracore,
+        "SRACore.util": util,
+        "SRACore.util.logger": logger_mod,
+        "SRACore.util.system": system_mod,
+        "SRACore.util.operator": operator_mod,
+        "SRACore.util.plugin": plugin_mod,
+    })
+    return True
+
+
+def load_plugin_module(name):
+    """
+    在不执行插件 __init__.py（避免启动检测线程和窗口）的情况下导入插件子模块
+
+    Args:
+        name: 子模块名，例如 "core"
+    """
+    if PACKAGE_NAME not in sys.modules:
+        package = types.ModuleType(PACKAGE_NAME)
+        package.__path__ = [PLUGIN_DIR]
+        sys.modules[PACKAGE_NAME] = package
+    return importlib.import_module(f"{PACKAGE_NAME}.{name}")
+#endregion
+
+
+#region 日志解析
+def parse_log_time(line):
+    """
+    解析日志行中的时间（第二个字段，格式 HH:MM:SS 或 HH:MM:SS.fff）
+
+    Returns:
+        当天的秒数，无法解析时返回None
+    """
+    parts = line.split(" ", 2)
+    if len(parts) < 2:
+        return None
+    try:
+        h, m, s = parts[1].split(":")
+        return int(h) * 3600 + int(m) * 60 + float(s.replace(",", "."))
+    except ValueError:
+        return None
+
+
+def read_log(path):
+    """读取日志文件，返回 [(距上一行的间隔秒数, 行内容)]"""
+    entries = []
+    last = None
+    with open(path, "r", encoding="utf-8", errors="replace") as f:
+        for raw in f:
+            line = raw.rstrip("\r\n")
+            if not line.strip():
+                continue
+            stamp = parse_log_time(line)
+            delta = 0.0
+            if stamp is not None:
+                if last is not None:
+                    delta = stamp - last
+                    if delta < 0:  # 跨过午夜
+                        delta += 86400
+                last = stamp
+            entries.append((delta, line))
+    return entries
+#endregion
+
+
+#region 处理器
+def make_listener_handler():
+    core = load_plugin_module("core")
+    return core.log_message_listener
+
+
+def make_overlay_handler():
+    from PySide6.QtWidgets import QApplication
+    app = QApplication.instance() or QApplication(sys.argv[:1])
+    ui = load_plugin_module("ui")
+    manager = ui.OverlayManager()
+    manager.timer.stop()
+    if manager.window is not None:
+        manager.window.timer.stop()  # 回放时不需要定位窗口
+    make_overlay_handler.keepalive = (app, manager)
+    make_overlay_handler.stats = manager.stats
+    return manager.on_log
+
+
+def make_fold_handler():
+    logfold = load_plugin_module("logfold")
+    folder = logfold.LogFolder()
+    make_fold_handler.stats = folder.stats
+    return folder.feed
+
+
+class ReplayExecutor:
+    """替代 TaskExecutor：回放期间始终有任务在执行，停止与重新提交都立即生效"""
+
+    last_config = None
+
+    def __init__(self):
+        self.running = True
+        self.stops = 0
+        self.submits = 0
+
+    def is_task_running(self):
+        return self.running
+
+    def stop_task(self):
+        self.stops += 1
+        self.running = False
+        return True
+
+    def execute_task(self, config_name=None):
+        self.submits += 1
+        self.running = True
+        return True
+
+
+def make_watchdog_handler():
+    logwatch = load_plugin_module("logwatch")
+    core = load_plugin_module("core")
+    watchdog = logwatch.LogSilenceWatchdog(ReplayExecutor(), core.cfgm.config)
+    clock = {"now": 0.0, "last": None}
+
+    def handler(msg):
+        # 以日志中的时间作为看门狗的时钟，倍速回放时也能按原始间隔判断静默
+        stamp = parse_log_time(msg)
+        if stamp is not None:
+            if clock["last"] is not None:
+                clock["now"] += (stamp - clock["last"]) % 86400
+            clock["last"] = stamp
+        watchdog.on_log(msg, now=clock["now"])
+        watchdog.check(now=clock["now"])
+
+    make_watchdog_handler.stats = lambda: watchdog.stats(now=clock["now"])
+    return handler
+
+
+# 可用的处理器，新增的日志处理逻辑在此注册即可参与回放
+HANDLERS = {
+    "listener": make_listener_handler,
+    "overlay": make_overlay_handler,
+    "fold": make_fold_handler,
+    "watchdog": make_watchdog_handler,
+}
+#endregion
+
+
+#region 回放
+class TimedSlot:
+    """包装处理器并记录每次调用的耗时"""
+
+    def __init__(self, name, slot):
+        self.name = name
+        self.slot = slot
+        self.samples = []
+        self.errors = 0
+
+    def __call__(self, msg):
+        start = time.perf_counter()
+        try:
+            self.slot(msg)
+        except Exception:
+            if self.errors == 0:
+                # 只打印每个处理器的第一次异常，避免刷屏
+                print(f"处理器 {self.name} 在处理以下日志时出错: {msg!r}", file=sys.stderr)
+                traceback.print_exc()
+            self.errors += 1
+        self.samples.append(time.perf_counter() - start)
+
+    def summary(self):
+        if not self.samples:
+            return f"{self.name:<10} 无调用"
+        ordered = sorted(self.samples)
+        n = len(ordered)
+        mean = sum(ordered) / n
+        p50 = ordered[n // 2]
+        p95 = ordered[min(n - 1, int(n * 0.95))]
+        return (f"{self.name:<10} n={n} mean={mean * 1e6:.1f}us p50={p50 * 1e6:.1f}us "
+                f"p95={p95 * 1e6:.1f}us max={ordered[-1] * 1e6:.1f}us errors={self.errors}")
+
+
+def replay(entries, emitter, speed=0.0, process_events=None):
+    """
+    按指定速度回放日志
+
+    Args:
+        entries: read_log 的返回值
+        emitter: 拥有 log_signal 的发送器
+        speed: 0 表示最快速度，1 表示原始速度，其它值为倍速
+        process_events: 每行之后调用的事件处理函数（Qt 模式下为 QApplication.processEvents）
+
+    Returns:
+        回放耗费的实际秒数
+    """
+    start = time.perf_counter()
+    virtual = 0.0
+    for delta, line in entries:
+        if speed > 0 and delta > 0:
+            virtual += delta / speed
+            wait = start + virtual - time.perf_counter()
+            if wait > 0:
+                time.sleep(wait)
+        emitter.log_signal.emit(line)
+        if process_events is not None:
+            process_events()
+    return time.perf_counter() - start
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="replay.py", description="ProjectRAX 日志回放工具")
+    parser.add_argument("logfile", help="SRA 日志文件")
+    parser.add_argument("--speed", type=float, default=0.0,
+                        help="回放倍速，0 为最快速度（默认），1 为原始速度")
+    parser.add_argument("--handler", action="append", choices=sorted(HANDLERS),
+                        help="参与回放的处理器，可重复指定（默认 listener）")
+    parser.add_argument("--verbose", action="store_true", help="输出插件自身的日志")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.DEBUG if args.verbose else logging.WARNING,
+                        format="%(asctime)s %(levelname)s %(message)s")
+    install_sracore_standins()
+
+    # 在临时目录中使用配置的副本，回放不会读写真实的 config.json 与 stamina_log.csv
+    with tempfile.TemporaryDirectory(prefix="projectrax_replay_") as data_dir:
+        shutil.copy(os.path.join(PLUGIN_DIR, "config.json"), data_dir)
+        os.environ["PROJECTRAX_DATA_DIR"] = data_dir
+        return run_replay(args)
+
+
+def run_replay(args):
+    entries = read_log(args.logfile)
+    # 通过插件实际连接的 log_emitter 发送，自行连接到它的组件（例如 connect_log_listener）也会被驱动
+    emitter = sys.modules["SRACore.util.logger"].log_emitter
+    slots = []
+    for name in args.handler or ["listener"]:
+        slot = TimedSlot(name, HANDLERS[name]())
+        emitter.log_signal.connect(slot)
+        slots.append(slot)
+
+    process_events = None
+    if "overlay" in (args.handler or []):
+        from PySide6.QtWidgets import QApplication
+        process_events = QApplication.processEvents
+
+    elapsed = replay(entries, emitter, args.speed, process_events)
+    original = sum(delta for delta, _ in entries)
+
+    print(f"行数: {len(entries)}  原始时长: {original:.1f}s  回放耗时: {elapsed:.3f}s  "
+          f"吞吐量: {len(entries) / elapsed if elapsed else float('inf'):.0f} 行/秒")
+    for slot in slots:
+        print(slot.summary())
+        stats = getattr(HANDLERS[slot.name], "stats", None)
+        if stats is not None:
+            print(f"{'':<10} {stats()}")
+    if "listener" in (args.handler or ["listener"]):
+        core = load_plugin_module("core")
+        print(f"daily_task_completed={core.daily_task_completed}")
+    return 1 if any(slot.errors for slot in slots) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
+#endregion
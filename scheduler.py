@@ -0,0 +1,229 @@
+# MIT License
+# Copyright (c) 2025 EveGlow
+"""
+ProjectRAX 开拓力感知调度
+
+从 SRA 日志中解析每次运行后的开拓力，按游戏的回复速度（默认每 6 分钟 1 点、上限 240）
+推算开拓力何时达到值得消耗的阈值，让任务检测线程直接睡到那个时间点，
+取代固定 check_delay 轮询带来的过早启动与溢出浪费。
+
+任务执行期间日志中的开拓力可能是消耗前的值，因此只暂存最后一次，任务结束后才采用。
+每次由插件启动任务时记录当时的预测值，并与运行后的首个实际开拓力一起写入日志及
+stamina_log.csv（每次运行一行）以便调参。
+"""
+#region 导入模块
+from SRACore.util.logger import logger
+
+import os
+import re
+import threading
+import time
+#endregion
+
+
+#region 常量
+DEFAULT_CAP = 240
+DEFAULT_REGEN_MINUTES = 6
+# 只匹配 "当前开拓力: 180/240" 这种 当前值/上限 的写法，避免把 "消耗开拓力 40 点" 之类的数字当成当前值
+DEFAULT_PATTERN = r"(?:开拓力|体力)\D{0,6}?(?<!\d)(\d{1,3})\s*/\s*(\d{2,3})(?!\d)"
+# 没有任何观测时，退回到固定间隔轮询；两次唤醒之间至少间隔的秒数
+MIN_SLEEP_SECONDS = 60
+#endregion
+
+
+#region 开拓力模型
+class StaminaModel:
+    """开拓力回复模型：记录最近一次观测值并推算任意时刻的开拓力"""
+
+    def __init__(self, cap=DEFAULT_CAP, regen_minutes=DEFAULT_REGEN_MINUTES):
+        self.cap = cap
+        self.regen_seconds = regen_minutes * 60
+        self.value = None
+        self.observed_at = None
+
+    def observe(self, value, cap=None, now=None):
+        """记录一次实际观测值"""
+        if cap:
+            self.cap = cap
+        self.value = value
+        self.observed_at = time.time() if now is None else now
+
+    def predict_uncapped(self, now=None):
+        """推算不考虑上限时的开拓力，超出上限的部分即为溢出浪费"""
+        if self.value is None:
+            return None
+        now = time.time() if now is None else now
+        return self.value + int(max(0.0, now - self.observed_at) // self.regen_seconds)
+
+    def predict(self, now=None):
+        """推算当前开拓力"""
+        uncapped = self.predict_uncapped(now)
+        if uncapped is None:
+            return None
+        # 已经超过上限的观测值（例如燃料/后备开拓力）不再回复，也不截断
+        return max(self.value, min(self.cap, uncapped))
+
+    def time_until(self, threshold, now=None):
+        """
+        推算距离开拓力达到阈值还需的秒数
+
+        Returns:
+            已达到返回0，没有观测值返回None
+        """
+        if self.value is None:
+            return None
+        now = time.time() if now is None else now
+        if self.value >= threshold:
+            return 0.0
+        due = self.observed_at + (threshold - self.value) * self.regen_seconds
+        return max(0.0, due - now)
+#endregion
+
+
+#region 调度器
+class StaminaScheduler:
+    """解析日志中的开拓力并计算下一次值得执行任务的时间"""
+
+    def __init__(self, config_manager, csv_path=None, is_running=None):
+        self.cfgm = config_manager
+        self.csv_path = csv_path
+        self.is_running = is_running or (lambda: False)
+        self.model = StaminaModel()
+        self.pending = None  # 任务执行期间暂存的最近一次观测 (当前值, 上限, 时间)
+        self.pattern = None
+        self.overflow_total = 0
+        self.observations = 0
+        self.last_run_at = None
+        self.run = None  # 最近一次启动的任务：(启动时间, 启动时的预测值, 启动前的溢出)，收到运行后的首个观测值后清空
+        self.runs = 0
+        self.replan_event = threading.Event()  # 有新的观测值时置位，通知检测线程重新计算睡眠时间
+        self.apply_config()
+
+    def apply_config(self):
+        config = self.cfgm.config
+        self.model.cap = config.get("stamina_cap", DEFAULT_CAP)
+        self.model.regen_seconds = config.get("stamina_regen_minutes", DEFAULT_REGEN_MINUTES) * 60
+        self.configured_threshold = config.get("stamina_threshold", self.model.cap - 10)
+        self.pattern = re.compile(config.get("stamina_pattern", DEFAULT_PATTERN))
+
+    @property
+    def threshold(self):
+        """实际使用的阈值：不超过上限，否则开拓力溢出后也永远达不到"""
+        return min(self.configured_threshold, self.model.cap)
+
+    @property
+    def enabled(self):
+        return self.cfgm.config.get("schedule_mode", "fixed") == "stamina"
+
+    def parse(self, msg):
+        """
+        从日志消息中解析开拓力
+
+        Returns:
+            (当前值, 上限或None)，未匹配返回None
+        """
+        match = self.pattern.search(msg)
+        if match is None:
+            return None
+        value = int(match.group(1))
+        cap = int(match.group(2)) if self.pattern.groups >= 2 and match.group(2) else None
+        return value, cap
+
+    def on_log(self, msg):
+        """日志监听入口"""
+        if not self.enabled or "ProjectRAX:" in msg:
+            # 跳过插件自身的日志，避免把自己输出的预测值当成观测值
+            return
+        parsed = self.parse(msg)
+        if parsed is None:
+            return
+        value, cap = parsed
+        now = time.time()
+        if self.is_running():
+            # 执行期间的开拓力可能是消耗前的值，只保留最后一次，任务结束后再采用
+            self.pending = (value, cap, now)
+            return
+        self.pending = None
+        self._observe(value, cap, now)
+
+    def settle(self):
+        """任务已结束时采用执行期间暂存的最后一次观测值"""
+        if self.pending is not None and not self.is_running():
+            pending, self.pending = self.pending, None
+            self._observe(*pending)
+
+    def _overflow(self, now):
+        """从上一次观测到 now 期间因达到上限而浪费的开拓力"""
+        uncapped = self.model.predict_uncapped(now)
+        return max(0, uncapped - self.model.cap) if uncapped is not None else 0
+
+    def _observe(self, value, cap, now):
+        if self.run is None:
+            # 两次观测之间没有由插件启动的任务，溢出在这里结算
+            self.overflow_total += self._overflow(now)
+        self.observations += 1
+        self.model.observe(value, cap, now)
+
+        if self.run is not None:
+            # 任务启动后的首个观测值即本次运行的实际结果
+            run_at, predicted, overflow = self.run
+            self.run = None
+            # 用 stamina 而不是“开拓力”，保证这一行不会被 stamina_pattern 匹配
+            logger.info(f"ProjectRAX: stamina run predicted={predicted if predicted is not None else '-'} "
+                        f"actual={value} cap={self.model.cap} overflow={overflow}")
+            self._append_csv(run_at, predicted, value, overflow)
+        self.replan_event.set()
+
+    def _append_csv(self, now, predicted, actual, overflow):
+        if not self.csv_path:
+            return
+        try:
+            new_file = not os.path.exists(self.csv_path)
+            with open(self.csv_path, "a", encoding="utf-8") as f:
+                if new_file:
+                    f.write("timestamp,predicted,actual,cap,overflow\n")
+                f.write(f"{now:.0f},{'' if predicted is None else predicted},{actual},{self.model.cap},{overflow}\n")
+        except OSError as e:
+            logger.warning(f"ProjectRAX: 写入开拓力记录失败: {e}")
+
+    def mark_run(self, now=None):
+        """
+        记录一次任务启动；在收到新的观测值前不再依据旧值判断
+
+        启动时的预测值会与运行后的首个观测值一起写入日志及 stamina_log.csv。
+        """
+        now = time.time() if now is None else now
+        overflow = self._overflow(now)
+        self.overflow_total += overflow
+        self.last_run_at = now
+        self.runs += 1
+        self.run = (now, self.model.predict(now), overflow)
+
+    def _stale(self):
+        return (self.model.observed_at is None
+                or (self.last_run_at is not None and self.model.observed_at < self.last_run_at))
+
+    def is_due(self, now=None):
+        """开拓力是否已达到值得消耗的阈值（任务执行期间始终为False）"""
+        if self.is_running():
+            return False
+        self.settle()
+        if self._stale():
+            return False
+        wait = self.model.time_until(self.threshold, now)
+        return wait is not None and wait <= 0
+
+    def seconds_until_next_run(self, fallback_seconds, now=None):
+        """
+        计算距离下一次值得执行任务的秒数
+
+        Args:
+            fallback_seconds: 尚无观测值时使用的固定间隔
+        """
+        self.apply_config()
+        self.settle()
+        if self._stale():
+            return fallback_seconds
+        wait = self.model.time_until(self.threshold, now)
+        return max(MIN_SLEEP_SECONDS, wait)
+#endregion
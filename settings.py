@@ -197,6 +197,20 @@ class Ui_MainWindow(object):
 
         self.verticalLayout_4.addWidget(self.frame_4)
 
+        self.frame_5 = QFrame(self.processprotect_settings)
+        self.frame_5.setObjectName(u"frame_5")
+        self.frame_5.setFrameShape(QFrame.Shape.StyledPanel)
+        self.frame_5.setFrameShadow(QFrame.Shadow.Plain)
+        self.horizontalLayout_6 = QHBoxLayout(self.frame_5)
+        self.horizontalLayout_6.setObjectName(u"horizontalLayout_6")
+        self.label_protector_stats = QLabel(self.frame_5)
+        self.label_protector_stats.setObjectName(u"label_protector_stats")
+
+        self.horizontalLayout_6.addWidget(self.label_protector_stats)
+
+
+        self.verticalLayout_4.addWidget(self.frame_5)
+
 
         self.verticalLayout.addWidget(self.processprotect_settings)
 
@@ -240,5 +254,6 @@ class Ui_MainWindow(object):
         self.processprotect_settings.setTitle(QCoreApplication.translate("MainWindow", u"\u8fdb\u7a0b\u4fdd\u62a4", None))
         self.label_processprotect_warning.setText(QCoreApplication.translate("MainWindow", u"\u76ee\u524d\u7b56\u7565\uff1a\u901a\u8fc7\u5916\u90e8\u5e94\u7528\u5bf9SRA\u8fdb\u7a0b\u8fdb\u884c\u68c0\u6d4b\uff0c\u5d29\u6e83\u540e\u81ea\u52a8\u91cd\u542f\u3002", None))
         self.button_enable_processprotect.setText(QCoreApplication.translate("MainWindow", u"\u542f\u7528\u8fdb\u7a0b\u4fdd\u62a4", None))
+        self.label_protector_stats.setText(QCoreApplication.translate("MainWindow", u"\u6682\u65e0\u8fdb\u7a0b\u4fdd\u62a4\u8bb0\u5f55", None))
     # retranslateUi
 
@@ -0,0 +1,291 @@
+# MIT License
+# Copyright (c) 2025 EveGlow
+"""
+ProjectRAX 画面静止检测
+
+游戏卡在对话框或黑屏时 SRA 仍在运行并持续输出日志，基于进程退出的保护发现不了这种情况。
+这里以较低频率截取游戏窗口区域，缩小成很小的灰度缩略图，与上一帧做向量化的 NumPy 差分；
+任务执行期间画面持续不变超过阈值即触发静止事件。
+
+截图来源可替换：OperatorFrameSource 通过 Operator 获取游戏窗口区域并截图，
+SyntheticFrameSource 则直接回放给定的图像序列，便于在 Linux 上测试。
+每次检测的耗时每隔 stall_report_minutes 分钟写入一行日志，界面模式下也能看到。
+"""
+#region 导入模块
+from SRACore.util.logger import logger
+
+import atexit
+import threading
+import time
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+try:
+    from PIL import ImageGrab
+except ImportError:
+    ImageGrab = None
+#endregion
+
+
+#region 常量
+THUMBNAIL_SIZE = (32, 18)  # 缩略图 (宽, 高)
+#endregion
+
+
+#region 截图来源
+class FrameSource:
+    """截图来源接口：grab() 返回 (高, 宽) 灰度或 (高, 宽, 通道) 彩色数组，无法截图时返回None"""
+
+    def grab(self):
+        raise NotImplementedError
+
+
+class OperatorFrameSource(FrameSource):
+    """通过 Operator 获取游戏窗口区域并截图"""
+
+    def __init__(self, operator):
+        self.operator = operator
+
+    def grab(self):
+        region = self.operator.get_win_region()
+        if not region:
+            return None
+        bbox = (region.left, region.top, region.left + region.width, region.top + region.height)
+        image = ImageGrab.grab(bbox=bbox)
+        # 先用 PIL 缩小到缩略图的整数倍，减少转换成数组的数据量
+        width, height = THUMBNAIL_SIZE
+        image = image.convert("L").resize((width * 4, height * 4))
+        return np.asarray(image)
+
+
+class SyntheticFrameSource(FrameSource):
+    """按顺序返回给定的图像序列，用于测试"""
+
+    def __init__(self, frames, loop=False):
+        self.frames = list(frames)
+        self.loop = loop
+        self.index = 0
+
+    def grab(self):
+        if self.index >= len(self.frames):
+            if not self.loop or not self.frames:
+                return None
+            self.index = 0
+        frame = self.frames[self.index]
+        self.index += 1
+        return frame
+#endregion
+
+
+#region 图像处理
+def downsample(frame, size=THUMBNAIL_SIZE):
+    """
+    把图像缩小为灰度缩略图（按块求平均）
+
+    Args:
+        frame: (高, 宽) 或 (高, 宽, 通道) 数组
+        size: 缩略图 (宽, 高)
+
+    Returns:
+        (高, 宽) float32 数组，取值 0-255
+    """
+    frame = np.asarray(frame, dtype=np.float32)
+    if frame.ndim == 3:
+        channels = frame.shape[2]
+        if channels >= 3:
+            frame = frame[..., :3] @ np.array([0.299, 0.587, 0.114], dtype=np.float32)
+        else:
+            frame = frame[..., 0]
+    width, height = size
+    block_h = max(1, frame.shape[0] // height)
+    block_w = max(1, frame.shape[1] // width)
+    rows = min(height, frame.shape[0] // block_h)
+    cols = min(width, frame.shape[1] // block_w)
+    frame = frame[:rows * block_h, :cols * block_w]
+    return frame.reshape(rows, block_h, cols, block_w).mean(axis=(1, 3))
+
+
+def frame_diff(a, b):
+    """两张缩略图的平均绝对差，归一化到 0-1"""
+    if a.shape != b.shape:
+        return 1.0
+    return float(np.abs(a - b).mean()) / 255.0
+#endregion
+
+
+#region 检测器
+class StallDetector:
+    """
+    画面静止检测器
+
+    Args:
+        source: FrameSource
+        is_active: 返回当前是否有任务在执行的函数，只在执行期间判定静止
+        threshold_seconds: 画面不变超过该秒数即视为静止
+        diff_threshold: 相邻缩略图平均差异低于该值视为“没有变化”
+        on_stall: 触发静止时调用，参数为已静止的秒数
+    """
+
+    def __init__(self, source, is_active, threshold_seconds=300, diff_threshold=0.01, on_stall=None):
+        self.source = source
+        self.is_active = is_active
+        self.threshold_seconds = threshold_seconds
+        self.diff_threshold = diff_threshold
+        self.on_stall = on_stall
+        self.previous = None
+        self.last_change = None
+        self.stalled = False
+        # 统计
+        self.checks = 0
+        self.stalls = 0
+        self.total_cost = 0.0
+        self.max_cost = 0.0
+        self.last_diff = None
+
+    def check(self, now=None):
+        """
+        执行一次检测
+
+        Returns:
+            本次是否触发了静止事件
+        """
+        now = time.monotonic() if now is None else now
+        start = time.perf_counter()
+        try:
+            if not self.is_active():
+                self.reset(now)
+                return False
+            frame = self.source.grab()
+            if frame is None:
+                return False
+            thumbnail = downsample(frame)
+        finally:
+            cost = time.perf_counter() - start
+            self.checks += 1
+            self.total_cost += cost
+            self.max_cost = max(self.max_cost, cost)
+
+        if self.previous is None or self.last_change is None:
+            self.previous = thumbnail
+            self.last_change = now
+            return False
+
+        self.last_diff = frame_diff(self.previous, thumbnail)
+        self.previous = thumbnail
+        if self.last_diff > self.diff_threshold:
+            self.last_change = now
+            self.stalled = False
+            return False
+
+        still = now - self.last_change
+        if still >= self.threshold_seconds and not self.stalled:
+            # 每段静止只触发一次，画面再次变化后才会重新计时
+            self.stalled = True
+            self.stalls += 1
+            logger.warning(f"ProjectRAX: 游戏画面已 {still:.0f} 秒没有变化，判定为卡住")
+            if self.on_stall is not None:
+                self.on_stall(still)
+            return True
+        return False
+
+    def reset(self, now=None):
+        self.previous = None
+        self.last_change = time.monotonic() if now is None else now
+        self.stalled = False
+
+    def summary(self):
+        """统计的单行摘要，用于日志"""
+        stats = self.stats()
+        return (f"检测 {stats['checks']} 次，判定静止 {stats['stalls']} 次，"
+                f"单次耗时平均 {stats['mean_cost_ms']:.1f} ms、最大 {stats['max_cost_ms']:.1f} ms")
+
+    def stats(self):
+        return {
+            "checks": self.checks,
+            "stalls": self.stalls,
+            "mean_cost_ms": self.total_cost / self.checks * 1000 if self.checks else 0.0,
+            "max_cost_ms": self.max_cost * 1000,
+            "last_diff": self.last_diff,
+        }
+
+
+class StallWatchdogThread(threading.Thread):
+    """按固定间隔调用 StallDetector.check 的后台线程"""
+
+    def __init__(self, detector, interval=5, report_interval=3600):
+        super().__init__(name="ProjectRAX-Stall", daemon=True)
+        self.detector = detector
+        self.interval = interval
+        self.report_interval = report_interval  # 输出统计日志的间隔秒数，0 表示只在停止时输出
+        self._stop_event = threading.Event()
+
+    def stop(self):
+        self._stop_event.set()
+
+    def run(self):
+        logger.info("ProjectRAX: 画面静止检测已启动")
+        next_report = time.monotonic() + self.report_interval
+        while not self._stop_event.wait(self.interval):
+            try:
+                self.detector.check()
+            except Exception as e:
+                logger.error(f"ProjectRAX: 画面静止检测出错: {e}")
+            if self.report_interval and time.monotonic() >= next_report:
+                next_report = time.monotonic() + self.report_interval
+                logger.info(f"ProjectRAX: 画面静止检测统计：{self.detector.summary()}")
+        logger.info(f"ProjectRAX: 画面静止检测已停止：{self.detector.summary()}")
+
+
+# 全局检测线程实例
+stall_watchdog = None
+
+
+def start_stall_watchdog(config, is_active, operator=None, on_stall=None):
+    """
+    按配置启动画面静止检测（已在运行时不重复启动）
+
+    Args:
+        config: 插件配置字典
+        is_active: 返回当前是否有任务在执行的函数
+        operator: SRACore 的 Operator 实例，为None时自动创建
+        on_stall: 触发静止时调用，参数为已静止的秒数
+    """
+    global stall_watchdog
+    if np is None:
+        logger.warning("ProjectRAX: 未安装 numpy，无法启用画面静止检测")
+        return None
+    if ImageGrab is None:
+        logger.warning("ProjectRAX: 未安装 Pillow，无法启用画面静止检测")
+        return None
+    if stall_watchdog is not None and stall_watchdog.is_alive():
+        return stall_watchdog
+    if operator is None:
+        from SRACore.util.operator import Operator
+        operator = Operator()
+    detector = StallDetector(
+        OperatorFrameSource(operator),
+        is_active,
+        threshold_seconds=config.get("stall_threshold_seconds", 300),
+        diff_threshold=config.get("stall_diff_threshold", 0.01),
+        on_stall=on_stall,
+    )
+    stall_watchdog = StallWatchdogThread(detector, config.get("stall_interval_seconds", 5),
+                                         config.get("stall_report_minutes", 60) * 60)
+    stall_watchdog.start()
+    atexit.unregister(stop_stall_watchdog)
+    atexit.register(stop_stall_watchdog)
+    return stall_watchdog
+
+
+def stop_stall_watchdog():
+    """停止画面静止检测，线程退出时会输出一行统计"""
+    global stall_watchdog
+    watchdog, stall_watchdog = stall_watchdog, None
+    if watchdog is None:
+        return
+    watchdog.stop()
+    watchdog.join(timeout=5)
+#endregion
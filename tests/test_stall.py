@@ -0,0 +1,39 @@
+# MIT License
+# Copyright (c) 2025 EveGlow
+"""画面静止检测测试：用 SyntheticFrameSource 回放图像序列，无需游戏窗口与 Pillow"""
+import os
+import sys
+
+import pytest
+
+np = pytest.importorskip("numpy")
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import replay  # noqa: E402
+
+replay.install_sracore_standins()
+stall = replay.load_plugin_module("stall")
+
+
+def solid(value):
+    return np.full((180, 320), value, dtype=np.uint8)
+
+
+def test_stall_fires_once_after_frames_stop_changing():
+    # 先是持续变化的画面，之后画面定格
+    changing = [solid(value) for value in range(0, 200, 20)]
+    still = [solid(200)] * 20
+    stalls = []
+    detector = stall.StallDetector(
+        stall.SyntheticFrameSource(changing + still),
+        is_active=lambda: True,
+        threshold_seconds=30,
+        on_stall=stalls.append,
+    )
+
+    fired = [detector.check(now=i * 5.0) for i in range(len(changing) + len(still))]
+
+    assert not any(fired[:len(changing)])
+    assert fired.count(True) == 1
+    assert len(stalls) == 1 and stalls[0] >= 30
+    assert detector.stats()["stalls"] == 1
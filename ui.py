@@ -0,0 +1,322 @@
+# MIT License
+# Copyright (c) 2025 EveGlow
+"""
+ProjectRAX 界面组件：透明日志窗口与设置窗口
+
+仅在非无界面模式下导入，避免无人值守的机器加载 Qt 控件。
+"""
+#region 导入模块
+from PySide6.QtCore import QObject, Qt, QTimer
+from PySide6.QtGui import QTextCursor
+from PySide6.QtWidgets import *
+
+from . import core
+from . import settings
+from .core import cfgm, task_executor
+from .logfold import DISPLAY_LEVELS, LogFolder, parse_log_line
+
+from SRACore.util import system as WindowsProcess
+from SRACore.util.logger import logger
+from SRACore.util.operator import Operator
+
+from collections import deque
+import os
+try:
+    from ctypes import windll
+except ImportError:  # 非 Windows 平台（例如在 Linux 上回放日志测试）
+    windll = None
+#endregion
+
+
+#region 变量
+operator = Operator()
+#endregion
+
+
+#region 透明日志窗口
+class TransparentLogWindow(QWidget):
+    def __init__(self):
+        super().__init__()
+
+        self.setWindowTitle("日志窗口")
+        self.setGeometry(100, 100, 500, 200)
+        self.setAttribute(Qt.WidgetAttribute.WA_TranslucentBackground)  # 设置窗口背景透明
+        self.setWindowFlags(
+            Qt.WindowType.FramelessWindowHint | Qt.WindowType.WindowStaysOnTopHint | Qt.WindowType.Tool)  # 无边框窗口，保持最前显示，隐藏任务栏图标
+        self.setAttribute(Qt.WidgetAttribute.WA_TransparentForMouseEvents)  # 设置鼠标事件穿透
+        # self.move(QApplication.primaryScreen().geometry().bottomLeft() - self.rect().bottomLeft() + QPoint(0, -300))  # 定位窗口到屏幕底部任务栏上方
+        # 设置窗口无边框样式
+        self.setStyleSheet("background-color: transparent; border: none;")
+
+        # 初始化日志显示文本框
+        self.log_view = QTextEdit(self)
+        self.log_view.setStyleSheet("background-color: transparent; color: white;")  # 透明背景，白色文字
+        self.log_view.setReadOnly(True)  # 只读模式
+        self.log_view.setLineWrapMode(QTextEdit.LineWrapMode.WidgetWidth)  # 按窗口宽度自动换行
+        self.log_view.setHorizontalScrollBarPolicy(Qt.ScrollBarPolicy.ScrollBarAlwaysOff)  # 禁用水平滚动条
+        self.log_view.setVerticalScrollBarPolicy(Qt.ScrollBarPolicy.ScrollBarAlwaysOff)  # 禁用垂直滚动条
+        self.log_view.setFocusPolicy(Qt.FocusPolicy.NoFocus)  # 禁止文本框获取焦点
+        self.log_view.setContextMenuPolicy(Qt.ContextMenuPolicy.NoContextMenu)  # 禁用右键菜单
+        self.last_line = None  # 最后一行的 (时间, 级别, 消息)，用于更新重复计数
+
+        # 初始化自动定位定时器
+        self.timer = QTimer()
+        self.timer.setInterval(1000)
+        self.timer.timeout.connect(self.update_location)
+        self.timer.start()
+
+        layout = QVBoxLayout(self)
+        layout.addWidget(self.log_view)
+
+        # 设置窗口不能进行点击操作
+        if windll is not None:
+            hwnd = int(self.winId())
+            ex_style = windll.user32.GetWindowLongW(hwnd, -20)
+            windll.user32.SetWindowLongW(hwnd, -20, ex_style | 0x80000 | 0x20)
+
+    def scroll_to_bottom(self):
+        """自动滚动到文本框底部"""
+        self.log_view.verticalScrollBar().setValue(self.log_view.verticalScrollBar().maximum())
+
+    def update_log(self, msg):
+        """
+        更新日志显示内容（不经过折叠与限流）
+
+        参数:
+            msg: 日志消息对象，包含level和message等信息
+        """
+        parsed = parse_log_line(msg)
+        if parsed is None or parsed[1].upper() not in DISPLAY_LEVELS:
+            return
+        self.append_line(*parsed)
+
+    def append_line(self, time, level, message, count=1):
+        """追加一行日志，count大于1时附带重复计数"""
+        self.last_line = (time, level, message)
+        self.log_view.append(self.build_html(time, level, message, count))
+        self.scroll_to_bottom()
+
+    def build_html(self, time, level, message, count=1):
+        color_map = {
+            "INFO": "#90EE90",
+            "WARNING": "yellow",
+            "ERROR": "red",
+            "SUCCESS": "green",
+            # "DEBUG": "lightblue" 测试可用
+        }
+        color = color_map.get(level.upper(), "white")
+        counter = f' <span style="color:#FFA500">×{count}</span>' if count > 1 else ""
+        # 构建带有阴影效果和颜色的HTML格式日志文本
+        font_family = "Microsoft YaHei Mono, Consolas, monospace"
+        return (
+            f'<div style="font-size:14px; font-weight:bold; font-family:\'{font_family}\'; '
+            f'padding: 2px 6px;">'
+            f'<span style="color:#D8BFD8">{time}</span> <span style="color:{color}">[{level}] </span> <span style="color:#7B68EE"> {message}</span>{counter}'
+            f'</div>'
+        )
+
+    def set_last_count(self, count, time, message):
+        """把最后一行替换为最近一次的内容并附带 ×count 计数"""
+        if self.last_line is None:
+            return
+        document = self.log_view.document()
+        if document.blockCount() <= 1:
+            self.log_view.clear()
+        else:
+            cursor = QTextCursor(document)
+            cursor.movePosition(QTextCursor.MoveOperation.End)
+            cursor.select(QTextCursor.SelectionType.BlockUnderCursor)  # 包含前一个段落分隔符
+            cursor.removeSelectedText()
+        self.append_line(time, self.last_line[1], message, count=count)
+
+    def render(self, ops):
+        """执行 LogFolder 输出的渲染操作"""
+        for op in ops:
+            if op[0] == "append":
+                self.append_line(*op[1:])
+            elif op[0] == "count":
+                self.set_last_count(*op[1:])
+            elif op[0] == "dropped":
+                _, level, dropped = op
+                self.last_line = None
+                self.log_view.append(
+                    f'<div style="font-size:12px; color:#A9A9A9; padding: 2px 6px;">'
+                    f'[{level}] 限流：已省略 {dropped} 行</div>'
+                )
+        if ops:
+            self.scroll_to_bottom()
+
+    def update_location(self):
+        region = operator.get_win_region()
+        if region:
+            top = region.top / operator.zoom
+            left = region.left / operator.zoom
+            self.setGeometry(int(left), int(top + 450), 500, 200)
+
+    def closeEvent(self, event):
+        """
+        窗口关闭事件处理
+
+        参数:
+            event: 关闭事件对象
+        """
+        print("窗口关闭，退出程序")
+        event.accept()  # 接受关闭事件
+#endregion
+
+
+#region 日志窗口生命周期
+class OverlayManager(QObject):
+    """
+    按游戏进程管理透明日志窗口的生命周期
+
+    游戏运行时才创建窗口，游戏退出后销毁窗口及其定时器与文本文档；
+    没有窗口期间收到的日志暂存在一个有界缓冲区中，窗口创建后一次性补上。
+    日志在进入窗口前先经过 LogFolder 折叠重复行并按级别限流。
+    """
+
+    def __init__(self, poll_seconds=5, buffer_lines=50, rate_limits=None):
+        super().__init__()
+        self.window = None
+        self.buffer = deque(maxlen=buffer_lines)
+        self.folder = LogFolder(rate_limits)
+        self.created = 0  # 创建窗口的次数
+        self.destroyed = 0  # 销毁窗口的次数
+
+        self.timer = QTimer(self)
+        self.timer.setInterval(int(poll_seconds * 1000))
+        self.timer.timeout.connect(self.poll)
+        self.timer.start()
+
+        # 定期把折叠中的重复计数显示出来，避免长时间重复时计数一直不更新
+        self.fold_timer = QTimer(self)
+        self.fold_timer.setInterval(1000)
+        self.fold_timer.timeout.connect(self.flush_folder)
+        self.poll()
+
+    def flush_folder(self):
+        if self.window is not None:
+            self.window.render(self.folder.flush())
+
+    def poll(self):
+        """检查游戏进程并创建/销毁窗口"""
+        running = WindowsProcess.is_process_running("StarRail.exe")
+        if running and self.window is None:
+            self.create_window()
+        elif not running and self.window is not None:
+            self.destroy_window()
+
+    def create_window(self):
+        self.window = TransparentLogWindow()
+        self.window.update_location()
+        self.window.show()
+        self.created += 1
+        self.fold_timer.start()
+        # 缓冲区本身已经有界，补放时不再限流
+        while self.buffer:
+            self.window.render(self.folder.feed(self.buffer.popleft(), limit=False))
+
+    def destroy_window(self):
+        window, self.window = self.window, None
+        self.fold_timer.stop()
+        self.folder.reset()
+        stats = self.folder.stats()
+        logger.debug(f"ProjectRAX: 日志窗口已销毁，累计输入 {stats['lines_in']} 行，"
+                     f"渲染 {stats['renders']} 次，节省 {stats['saved']} 次（折叠 {stats['folded']}，限流 {stats['dropped']}）")
+        window.timer.stop()
+        window.close()
+        window.deleteLater()
+        self.destroyed += 1
+
+    def on_log(self, msg):
+        """日志信号入口"""
+        if self.window is not None:
+            self.window.render(self.folder.feed(msg))
+            return
+        # 只缓存窗口会显示的级别，避免 DEBUG 日志挤掉有用的内容
+        parsed = parse_log_line(msg)
+        if parsed is not None and parsed[1].upper() in DISPLAY_LEVELS:
+            self.buffer.append(msg)
+
+    def stats(self):
+        """折叠与限流统计（saved 为节省的渲染次数）"""
+        return self.folder.stats()
+
+    def stop(self):
+        """停止轮询并销毁窗口"""
+        self.timer.stop()
+        if self.window is not None:
+            self.destroy_window()
+#endregion
+
+
+#region 设置窗口
+class ConfigWindow(QMainWindow):
+    def __init__(self):
+        super().__init__()
+
+        self.ui = settings.Ui_MainWindow()
+        self.ui.setupUi(self)
+        self.ui.checkbox_display.stateChanged.connect(self.changecfg_static)
+        self.ui.spinBox.valueChanged.connect(self.changecfg_static)
+        self.ui.btn_enable_taskflag.clicked.connect(self.enable_taskcheck)
+        self.ui.button_enable_processprotect.clicked.connect(self.enable_processprotect)
+
+        # 添加手动执行任务按钮
+        self.manual_execute_button = QPushButton("手动执行任务", self)
+        self.manual_execute_button.clicked.connect(self.manual_execute_task)
+        # 将按钮添加到界面（需要根据实际UI布局调整）
+
+        # 添加配置选择下拉框
+        self.config_combo = QComboBox(self)
+        self.refresh_config_list()
+        self.refresh_protector_stats()
+
+    def refresh_config_list(self):
+        """刷新配置列表"""
+        configs = task_executor.get_available_configs()
+        self.config_combo.clear()
+        self.config_combo.addItem("使用当前配置", None)
+        for config in configs:
+            self.config_combo.addItem(config, config)
+
+    def refresh_protector_stats(self):
+        """刷新进程保护统计（最近7天）"""
+        summary = core.get_protector_summary(7)
+        if summary is None or not summary["supervised_secs"]:
+            self.ui.label_protector_stats.setText("暂无进程保护记录")
+            return
+
+        def fmt(value, unit_format):
+            return "-" if value is None else unit_format.format(value)
+
+        self.ui.label_protector_stats.setText(
+            f"最近7天：在线率 {fmt(summary['uptime_percent'], '{:.1f}%')}，"
+            f"启动 {summary['launches']} 次，崩溃 {summary['crashes']} 次"
+            f"（{fmt(summary['crashes_per_day'], '{:.2f}')} 次/天）\n"
+            f"平均无故障时间 {fmt(summary['mtbf_secs'] and summary['mtbf_secs'] / 3600, '{:.1f} 小时')}，"
+            f"平均重启耗时 {fmt(summary['mean_relaunch_secs'], '{:.1f} 秒')}"
+        )
+
+    def manual_execute_task(self):
+        """手动执行任务"""
+        selected_config = self.config_combo.currentData()
+        if task_executor.execute_task(selected_config):
+            logger.info("ProjectRAX: 手动任务执行已开始")
+        else:
+            logger.error("ProjectRAX: 手动任务执行失败")
+
+    def changecfg_static(self):
+        showLog = self.ui.checkbox_display.isChecked()
+        check_delay = self.ui.spinBox.value()
+
+        cfgm.change_config("showLog", showLog)
+        cfgm.change_config("check_delay", check_delay)
+
+    def enable_taskcheck(self):
+        core.enable_task_check()
+
+    def enable_processprotect(self):
+        if core.launch_process_protector():
+            os._exit(0)
+#endregion